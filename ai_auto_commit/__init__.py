@@ -1,13 +1,37 @@
 """AI Auto Commit - AI-powered git commit and push tool."""
 
-import warnings
+from __future__ import annotations
 
-# Suppress Pydantic V1 compatibility warning from langchain-core on Python 3.14+
-warnings.filterwarnings("ignore", message="Core Pydantic V1")
+import importlib
+from typing import TYPE_CHECKING, Any
 
-from .ai_auto_commit import auto_commit_and_push
-from .api_client import init
-from .models import get_all_providers, get_default_model, set_default_model
+if TYPE_CHECKING:
+    from .ai_auto_commit import auto_commit_and_push
+    from .api_client import init
+    from .models import get_all_providers, get_default_model, set_default_model
 
 __all__ = ["auto_commit_and_push", "init", "get_all_providers", "get_default_model", "set_default_model"]
 
+# Public names are resolved from their submodules on first access, so that
+# importing a light submodule (e.g. the CLI for `autocommit config get`)
+# doesn't pull in the commit pipeline and the LLM client stack.
+_EXPORTS = {
+    "auto_commit_and_push": ".ai_auto_commit",
+    "init": ".api_client",
+    "get_all_providers": ".models",
+    "get_default_model": ".models",
+    "set_default_model": ".models",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,6 @@
+"""Allow running the tool with `python -m ai_auto_commit`."""
+
+from .cli import main
+
+if __name__ == "__main__":
+    main()
@@ -4,40 +4,186 @@
 
 from __future__ import annotations
 
+import argparse
+import asyncio
+import io
 import subprocess
+import sys
 from pathlib import Path
-from typing import List, Literal, Optional
+from typing import Iterable, Iterator, List, Literal, Optional, Tuple
 
-from ai_auto_commit.api_client import ensure_initialized, init
-from ai_auto_commit.cli import prompt_for_commit_comment
-from ai_auto_commit.commit_generation import smart_hierarchical_commit_message
-from ai_auto_commit.git_operations import (
+from .api_client import ensure_initialized, init, prefetch_network_connectivity
+from .cli import prompt_for_commit_comment
+from .commit_generation import smart_hierarchical_commit_message
+from .git_operations import (
     GitPushError,
+    arun_git_command,
+    arun_git_command_output,
     clear_git_cache,
+    current_branch,
     get_target_directory,
-    has_changes,
     has_unpushed_commits,
     push_with_recovery,
     run_git_command,
     run_git_command_output,
+    run_git_command_stream,
     show_changes_summary,
 )
-from ai_auto_commit.git_safety import (
+from .git_safety import (
     cleanup_backup,
     create_safety_backup,
+    snapshot_status,
     verify_no_files_deleted,
     verify_working_directory_safety,
 )
-from ai_auto_commit.heuristic_commits import (
+from .heuristic_commits import (
     build_heuristic_bullets,
     compose_commit_from_bullets,
-    parse_name_status,
-    parse_numstat,
+    compose_commit_from_bullets_local,
+    is_trivial_change,
+    parse_raw_numstat,
 )
-from ai_auto_commit.large_diff_handler import handle_large_diff
-from ai_auto_commit.token_budget import get_max_token_budget, get_tokens_spent, reset_token_budget
-from ai_auto_commit.token_utils import token_len
-from ai_auto_commit.models import get_default_model
+from .large_diff_handler import handle_large_diff
+from .token_budget import get_max_token_budget, get_tokens_spent, reset_token_budget
+from .token_utils import token_len
+from .models import get_default_model
+
+# Lock files and binary assets whose diffs are noise for commit messages:
+# exact file names, plus extensions checked with a single str.endswith call
+_SKIP_NAMES = frozenset({
+    "package-lock.json", "pnpm-lock.yaml", "yarn.lock", "Cargo.lock", "composer.lock",
+})
+_SKIP_EXTS = (".png", ".jpg", ".jpeg", ".gif", ".ico", ".pdf")
+_DIFF_GIT = "diff --git"
+
+# Index (first) column of `status --porcelain`: Added, Modified, Deleted,
+# Renamed, Copied. A space or '?' means nothing is staged for that path.
+_STAGED = frozenset("AMDRC")
+
+
+def _is_skipped_path(path: str) -> bool:
+    """Whether a diff for `path` should be left out of the commit-message input."""
+    return path.endswith(_SKIP_EXTS) or path.rpartition("/")[2] in _SKIP_NAMES
+
+
+def _filter_skipped_files(lines: Iterable[str]) -> Iterator[str]:
+    """Yield diff lines, dropping whole file sections for skipped paths."""
+    skip_file = False
+    for line in lines:
+        if line.startswith(_DIFF_GIT):
+            # Only the b/ path of the header decides (quotes from git's
+            # escaping of unusual names are stripped with the newline)
+            skip_file = _is_skipped_path(line.rstrip('"\n').rpartition(" b/")[2])
+        if not skip_file:
+            yield line
+
+
+def _read_filtered_diff(target_dir: Path, *args: str) -> str:
+    """Stream a git diff, keeping only the file sections for non-skipped paths."""
+    buffer = io.StringIO()
+    buffer.writelines(_filter_skipped_files(run_git_command_stream(target_dir, *args)))
+    return buffer.getvalue().strip()
+
+
+async def _gather_commit_inputs(
+    target_dir: Path, remote: str
+) -> Tuple[
+    Optional[str], Optional[str], Optional[str], Optional[str], bool,
+]:
+    """
+    Run the independent read-only git queries needed for a commit concurrently.
+
+    Returns
+    -------
+    tuple
+        (status_summary, diff_cached, raw_numstat_out, branch,
+        unpushed_flag). `diff_cached` is already stripped
+        of lock file and binary sections. Any query that fails yields None so
+        the caller can apply the same fallbacks as the sequential helpers.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def query(*args: str) -> Optional[str]:
+        try:
+            return await arun_git_command_output(target_dir, *args)
+        except subprocess.CalledProcessError:
+            return None
+
+    async def filtered_diff(*args: str) -> Optional[str]:
+        # Streamed through a worker thread so the diff is filtered while git
+        # is still producing it and is never held unfiltered in memory
+        try:
+            return await loop.run_in_executor(
+                None, _read_filtered_diff, target_dir, *args
+            )
+        except subprocess.CalledProcessError:
+            return None
+
+    async def branch_name() -> Optional[str]:
+        try:
+            return await loop.run_in_executor(None, current_branch, target_dir)
+        except subprocess.CalledProcessError:
+            return None
+
+    (
+        status_summary,
+        diff_cached,
+        raw_numstat_out,
+        branch,
+        unpushed_flag,
+    ) = await asyncio.gather(
+        query("status"),
+        # Minimal context lines; end of options; current directory
+        filtered_diff("diff", "--cached", "-U0", "--", "."),
+        # Per-file status and line counts in one NUL-delimited pass
+        query("diff", "--cached", "--raw", "--numstat", "--no-abbrev", "-z"),
+        branch_name(),
+        loop.run_in_executor(None, has_unpushed_commits, target_dir, remote),
+    )
+    return (
+        status_summary,
+        diff_cached,
+        raw_numstat_out,
+        branch,
+        unpushed_flag,
+    )
+
+
+async def _push_and_finish(
+    target_dir: Path,
+    remote: str,
+    branch: str,
+    original_status: str,
+    backup_dir: Optional[Path],
+) -> Optional[subprocess.CalledProcessError]:
+    """
+    Push in the background while the local post-commit steps run.
+
+    The safety verification and backup cleanup only touch the working tree,
+    so they run in a worker thread while `git push` talks to the remote.
+    Returns the push failure, if any, so the caller can hand it to the
+    interactive recovery flow once the local steps have finished printing.
+    """
+    push_task = asyncio.ensure_future(arun_git_command(target_dir, "push", remote, branch))
+
+    def finish() -> None:
+        # ── 7. Final safety verification ─────────────────────────────────
+        print("\nPerforming final safety verification...")
+        if not verify_no_files_deleted(target_dir, original_status):
+            print(
+                "  → Warning: Some files may have been affected. "
+                "Check your working directory."
+            )
+
+        # ── 8. Cleanup ───────────────────────────────────────────────────
+        cleanup_backup(backup_dir)
+
+    await asyncio.get_running_loop().run_in_executor(None, finish)
+    try:
+        await push_task
+    except subprocess.CalledProcessError as e:
+        return e
+    return None
 
 
 def auto_commit_and_push(
@@ -48,6 +194,8 @@ def auto_commit_and_push(
     large_diff_strategy: Optional[Literal["split", "truncate", "cancel"]] = None,
     auto_recover_push: bool = False,
     non_interactive: bool = False,
+    force_llm: bool = False,
+    comment: Optional[str] = None,
 ) -> str:
     """
     Generate a commit message from already staged files, commit, and push.
@@ -70,6 +218,14 @@ def auto_commit_and_push(
     auto_recover_push : bool
         If True, automatically attempt to recover from push failures (e.g., by
         rebasing) without prompting. Default is False (prompt user).
+    force_llm : bool
+        If True, always ask the model for a fresh message. By default, trivial
+        changes (at most two files and a handful of lines) are described
+        directly from the heuristic bullets without an API call, and a
+        message cached for the same changes is reused.
+    comment : str, optional
+        Comment to add to the top of the generated message. When given, the
+        user is not prompted for one.
 
     Returns
     -------
@@ -97,23 +253,34 @@ def auto_commit_and_push(
     # ── Safety verification ─────────────────────────────────────────────
     if not verify_working_directory_safety(target_dir):
         raise RuntimeError("Working directory safety verification failed")
+    # Rendered from the status the safety check just ran; it serves the
+    # change check, the staged-files listing and the comparison at the end
+    porcelain = snapshot_status(target_dir)
 
     # ── Check if there are any changes to commit or unpushed commits ─────
+    # All read-only queries (status, staged diffs, branch, ahead count) are
+    # independent, so they run concurrently; writes stay sequential below.
     print("Checking repository status...")
+    # The API reachability check is only consulted if generation fails;
+    # resolve it in the background so it's ready by then.
+    prefetch_network_connectivity()
+
+    (
+        status_summary,
+        diff_cached,
+        raw_numstat_out,
+        branch,
+        unpushed_flag,
+    ) = asyncio.run(_gather_commit_inputs(target_dir, remote))
+    has_local_changes = bool(porcelain)
     
-    has_local_changes = has_changes(target_dir)
-    has_unpushed_commits_var = has_unpushed_commits(target_dir, remote)
-    
-    if not has_local_changes and not has_unpushed_commits_var:
+    if not has_local_changes and not unpushed_flag:
         print("Repository is clean and up to date. Nothing to commit or push.")
         return "Repository up to date - no changes needed"
     
-    if has_unpushed_commits_var and not has_local_changes:
+    if unpushed_flag and not has_local_changes:
         print("Found unpushed commits. Proceeding to push...")
         # Skip the commit generation and staging, just push
-        branch = run_git_command_output(
-            target_dir, "rev-parse", "--abbrev-ref", "HEAD"
-        ).strip()
         push_with_recovery(
             target_dir, remote, branch,
             auto_recover=auto_recover_push,
@@ -121,10 +288,10 @@ def auto_commit_and_push(
         return "Pushed existing commits"
 
     # ── Show changes summary ─────────────────────────────────────────────
-    show_changes_summary(target_dir)
+    show_changes_summary(target_dir, status_summary)
 
     # ── Store original status for safety verification ────────────────────
-    original_status = run_git_command_output(target_dir, "status", "--porcelain")
+    original_status = porcelain
 
     # ── Ensure API key is initialized ─────────────────────────────────────
     ensure_initialized()
@@ -137,26 +304,20 @@ def auto_commit_and_push(
     
     # ── 1. Check for already staged files ───────────────────────────────
     # Get staged files from git status (files with first char indicating staged status)
-    result = run_git_command_output(target_dir, "status", "--porcelain")
     staged_files: List[str] = []
+    # The whole report is written in one go rather than line by line
+    lines_out: List[str] = ["\nChecking for staged files..."]
     
-    print("\nChecking for staged files...")
-    
-    for line in result.strip().split("\n"):
-        if not line:
+    for line in porcelain.splitlines():
+        # Snapshot lines are "XY <path>": two status chars, then a space
+        if len(line) < 4 or line[0] not in _STAGED:
             continue
-            
-        status = line[:2]
-        filename = line[2:].lstrip()  # Skip the 2-char status and any leading spaces
-        
-        # First char indicates staging area status:
-        # A = Added, M = Modified, D = Deleted, R = Renamed, C = Copied
-        # Space means not staged
-        if status[0] in ['A', 'M', 'D', 'R', 'C']:
-            staged_files.append(filename)
-            print(f"  → Found staged file: {filename} ({status[0]})")
+        filename = line[3:]
+        staged_files.append(filename)
+        lines_out.append(f"  → Found staged file: {filename} ({line[0]})")
     
     if not staged_files:
+        sys.stdout.write("\n".join(lines_out) + "\n")
         raise RuntimeError(
             "No staged files found. Please stage files first using:\n"
             "  git add <files>    # Stage specific files\n"
@@ -164,46 +325,19 @@ def auto_commit_and_push(
             "Then run this tool again."
         )
 
-    print(f"\nFound {len(staged_files)} staged file(s):")
-    for file in staged_files:
-        print(f"  - {file}")
+    lines_out.append(f"\nFound {len(staged_files)} staged file(s):")
+    lines_out.extend(f"  - {file}" for file in staged_files)
+    sys.stdout.write("\n".join(lines_out) + "\n")
 
     # ── 2. Get staged diff with optimizations ─────────────────────────────
-    # Use optimized diff command: minimal context, exclude lock files, no binary diffs
-    diff_args = [
-        "diff", "--cached", "-U0",  # Minimal context lines
-        "--",  # End of options
-        ".",  # Current directory
-    ]
-    
-    try:
-        diff = run_git_command_output(target_dir, *diff_args).strip()
-    except subprocess.CalledProcessError:
+    # The optimized diff (minimal context, lock files and binaries filtered
+    # out while streaming) was collected above
+    if diff_cached is not None:
+        diff = diff_cached
+    else:
         # Fallback to basic diff if optimized version fails
         print("  → Optimized diff failed, using basic diff...")
-        diff = run_git_command_output(target_dir, "diff", "--cached").strip()
-    
-    # Filter out binary files and lock files from the diff
-    if diff:
-        lines = diff.split('\n')
-        filtered_lines: List[str] = []
-        skip_file = False
-        
-        for line in lines:
-            if line.startswith('diff --git'):
-                # Check if this is a file we want to skip
-                file_path = line.split()[-1] if len(line.split()) > 2 else ""
-                skip_file = any(skip_pattern in file_path for skip_pattern in [
-                    'package-lock.json', 'pnpm-lock.yaml', 'yarn.lock', 
-                    'Cargo.lock', 'composer.lock', '.png', '.jpg', '.jpeg', 
-                    '.gif', '.ico', '.pdf'
-                ])
-                if not skip_file:
-                    filtered_lines.append(line)
-            elif not skip_file:
-                filtered_lines.append(line)
-        
-        diff = '\n'.join(filtered_lines)
+        diff = _read_filtered_diff(target_dir, "diff", "--cached")
     
     if not diff:
         raise RuntimeError("No staged changes to commit.")
@@ -224,70 +358,59 @@ def auto_commit_and_push(
         diff = result
         
         # ── 4. Prefer token-light heuristic bullets → single small LLM call ─────
-        try:
-            name_status_out = run_git_command_output(
-                target_dir, "diff", "--cached", "--name-status"
-            )
-            numstat_out = run_git_command_output(
-                target_dir, "diff", "--cached", "--numstat"
-            )
-            file_status = parse_name_status(name_status_out)
-            file_stats = parse_numstat(numstat_out)
+        if raw_numstat_out is not None:
+            file_status, file_stats = parse_raw_numstat(raw_numstat_out)
             bullets = build_heuristic_bullets(file_status, file_stats)
-        except subprocess.CalledProcessError:
+        else:
+            file_stats = {}
             bullets = []
 
-        if bullets:
+        if bullets and not force_llm and is_trivial_change(file_stats):
+            print("Trivial change, composing commit locally (use --force-llm to override)...")
+            commit_msg = compose_commit_from_bullets_local(bullets)
+        elif bullets:
             print("Composing commit from summarized staged changes (no raw diffs)...")
             commit_msg = compose_commit_from_bullets(
-                bullets, model=model, temperature=temperature
+                bullets, model=model, temperature=temperature, use_cache=not force_llm
             )
         else:
             # Fallback: use hierarchical diff-based approach if bullets couldn't be built
             print("Using smart hierarchical commit message generation...")
             commit_msg = smart_hierarchical_commit_message(
-                diff, model=model, temperature=temperature
+                diff, model=model, temperature=temperature, use_cache=not force_llm
             )
     
     # Show final token usage
-    from .token_budget import get_max_token_budget
     print(f"Final token usage: {get_tokens_spent():,}/{get_max_token_budget():,} tokens")
 
     # ── 4. Ask for user comment on commit message ───────────────────────
-    final_commit_msg = prompt_for_commit_comment(commit_msg, non_interactive)
+    final_commit_msg = prompt_for_commit_comment(commit_msg, non_interactive, comment)
 
     # ── 5. Commit ───────────────────────────────────────────────────────
     run_git_command(target_dir, "commit", "-m", final_commit_msg)
 
-    # ── 6. Push ─────────────────────────────────────────────────────────
-    # Determine current branch (detached HEAD will just push HEAD)
-    branch = run_git_command_output(
-        target_dir, "rev-parse", "--abbrev-ref", "HEAD"
-    ).strip()
-    push_with_recovery(
-        target_dir, remote, branch,
-        auto_recover=auto_recover_push,
+    # ── 6. Push (overlapped with steps 7 and 8) ─────────────────────────
+    # Current branch was collected above (detached HEAD will just push HEAD);
+    # a repository without commits only gets a resolvable HEAD after commit.
+    if branch is None:
+        branch = run_git_command_output(
+            target_dir, "rev-parse", "--abbrev-ref", "HEAD"
+        ).strip()
+    push_error = asyncio.run(
+        _push_and_finish(target_dir, remote, branch, original_status, backup_dir)
     )
-
-    # ── 7. Final safety verification ─────────────────────────────────────
-    print("\nPerforming final safety verification...")
-    if not verify_no_files_deleted(target_dir, original_status):
-        print(
-            "  → Warning: Some files may have been affected. "
-            "Check your working directory."
+    if push_error is not None:
+        push_with_recovery(
+            target_dir, remote, branch,
+            auto_recover=auto_recover_push,
+            initial_error=push_error,
         )
-    
-    # ── 8. Cleanup ─────────────────────────────────────────────────────
-    cleanup_backup(backup_dir)
 
     return final_commit_msg
 
 
 def main() -> None:
     """Main CLI entry point."""
-    import argparse
-    import sys
-    
     parser = argparse.ArgumentParser(
         description="AI-powered git commit and push tool",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -370,15 +493,19 @@ Note: Files must be staged first using 'git add <files>' or 'git add .' before r
         default=False,
         help="Run in non-interactive mode. Do not prompt for user input."
     )
+
+    parser.add_argument(
+        "--force-llm",
+        action="store_true",
+        default=False,
+        help="Always generate a fresh message with the model, even for trivial or cached changes."
+    )
     
     args = parser.parse_args()
     
     # Handle --set-default-model flag (exit early if set)
     if args.set_default_model:
-        try:
-            from .models import set_default_model, get_model_config
-        except ImportError:
-            from models import set_default_model, get_model_config
+        from .models import get_model_config, set_default_model
         
         model_name = args.set_default_model
         # Validate model if it's a known model
@@ -414,6 +541,7 @@ Note: Files must be staged first using 'git add <files>' or 'git add .' before r
             large_diff_strategy=args.large_diff,
             auto_recover_push=args.auto_recover,
             non_interactive=args.non_interactive,
+            force_llm=args.force_llm,
         )
         
         print("\n" + "=" * 60)
@@ -3,13 +3,18 @@
 from __future__ import annotations
 
 import socket
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Tuple
+
 from dotenv import load_dotenv # New import
 
 # Load environment variables from .env file when the module is imported
 load_dotenv() # Moved here from init()
 
 from .llm_client import initialize_provider
-from .models import Provider, get_all_providers, get_api_key
+from .models import Provider, get_all_api_keys, get_all_providers, get_api_key
 
 
 def init(
@@ -20,23 +25,21 @@ def init(
     """
     Initialize AI provider API keys.
     """
-    from .models import get_all_api_keys
-
-    # Initialize the main provider if explicit key provided
+    # Collect one key per provider, then initialize each provider once.
+    # Precedence: explicit key > keyword arguments > keys stored in config
+    # (all stored providers are included so the default model's provider is
+    # always initialized).
+    known = set(get_all_providers())
+    pending: dict[str, str] = {
+        prov: key for prov, key in get_all_api_keys().items()
+        if key and prov in known
+    }
+    pending.update((prov, key) for prov, key in kwargs.items() if prov in known)
     if api_key is not None:
-        initialize_provider(provider, api_key.strip())
-
-    # Initialize additional providers from kwargs
-    for prov, key in kwargs.items():
-        if prov in get_all_providers():
-            initialize_provider(prov, key.strip())
+        pending[provider] = api_key
 
-    # Initialize ALL providers that have API keys stored in config file
-    # This ensures the default model's provider is always initialized
-    stored_keys = get_all_api_keys()
-    for prov, key in stored_keys.items():
-        if key and prov in get_all_providers():
-            initialize_provider(prov, key.strip())
+    for prov, key in pending.items():
+        initialize_provider(prov, key.strip())
 
 
 def ensure_initialized() -> None:
@@ -45,15 +48,60 @@ def ensure_initialized() -> None:
     pass
 
 
+# Connectivity results are reused for this many seconds
+_NETWORK_CHECK_TTL = 30.0
+_network_checks: Dict[Tuple[str, int], Tuple[bool, float]] = {}
+_network_probes: Dict[Tuple[str, int], "Future[Tuple[bool, float]]"] = {}
+
+
+def _probe_network(host: str, port: int, timeout: float) -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def prefetch_network_connectivity(
+    host: str = "api.openai.com", port: int = 443, timeout: int = 5
+) -> None:
+    """Start a connectivity probe in the background.
+
+    A later `check_network_connectivity` call for the same host picks up the
+    result instead of paying the DNS lookup and TCP handshake itself.
+    """
+    key = (host, port)
+    if key in _network_probes:
+        return
+    future: Future[Tuple[bool, float]] = Future()
+
+    def run() -> None:
+        future.set_result((_probe_network(host, port, timeout), time.monotonic()))
+
+    _network_probes[key] = future
+    threading.Thread(target=run, daemon=True).start()
+
+
 def check_network_connectivity(
     host: str = "api.openai.com", port: int = 443, timeout: int = 5
 ) -> bool:
-    """Check if we can connect to OpenAI's API server."""
-    try:
-        socket.create_connection((host, port), timeout=timeout)
-        return True
-    except (socket.timeout, socket.error):
-        return False
+    """Check if we can connect to OpenAI's API server.
+
+    Results are cached for a short while, and a probe started with
+    `prefetch_network_connectivity` is awaited instead of starting a new one.
+    """
+    key = (host, port)
+    cached = _network_checks.get(key)
+    if cached is not None and time.monotonic() - cached[1] < _NETWORK_CHECK_TTL:
+        return cached[0]
+    probe = _network_probes.pop(key, None)
+    if probe is not None:
+        cached = probe.result()
+    # A prefetched answer is as stale as a cached one once the TTL has passed
+    if probe is None or time.monotonic() - cached[1] >= _NETWORK_CHECK_TTL:
+        cached = (_probe_network(host, port, timeout), time.monotonic())
+    _network_checks[key] = cached
+    return cached[0]
 
 
 def generate_fallback_commit_message() -> str:
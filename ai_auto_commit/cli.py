@@ -2,40 +2,77 @@
 
 from __future__ import annotations
 
+import argparse
+import json
+import os
+import shutil
+import subprocess
 import sys
 from pathlib import Path
+from typing import Optional
 
-from InquirerPy import inquirer
-from InquirerPy.base.control import Choice
+# Heavier dependencies (InquirerPy, the git helpers, the commit pipeline and
+# the LLM client stack) are imported inside the functions that use them, so
+# quick commands like `autocommit config get` start without loading them.
 
-from ai_auto_commit.git_operations import run_git_command_output
+_SEP = "=" * 60
+_RULE = "=" * 50
+_CONFIRM_QUESTION = "Is this git commit and path correct?"
+# Seconds `prompt_for_files` waits for `git status` before prompting without it
+_STATUS_WAIT = 0.2
+
+
+def _stdin_is_tty() -> bool:
+    """Whether prompts can be answered, i.e. stdin is an interactive terminal.
+
+    Scripts and CI pipe stdin, in which case every prompt resolves to its
+    default without doing the work to draw it.
+    """
+    return sys.stdin is not None and sys.stdin.isatty()
 
 
 def prompt_for_files(target_dir: Path) -> str:
     """Prompt user for files to commit, default to '.' (all files)."""
-    print("\n" + "=" * 60)
-    print("📁 File Selection")
-    print("=" * 60)
-    
-    # Show available changes
+    if not _stdin_is_tty():
+        return '.'
+
+    from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+    from .git_operations import status_short
+
+    # Start `git status` first; it runs while InquirerPy loads and the
+    # instructions are printed
+    executor = ThreadPoolExecutor(max_workers=1)
+    status_future = executor.submit(status_short, target_dir)
+    executor.shutdown(wait=False)
+
+    from InquirerPy import inquirer
+
+    sys.stdout.write(
+        f"\n{_SEP}\n📁 File Selection\n{_SEP}\n"
+        "\nEnter files/paths to commit (space-separated, or '.' for all files):\n"
+        "Examples:\n"
+        "  - Press Enter or type '.' for all files\n"
+        "  - 'file1.py file2.py' for specific files\n"
+        "  - 'src/' for a directory\n"
+        "  - '*.py' for all Python files\n"
+    )
+
+    # Show available changes if git has them ready; on a slow repository the
+    # prompt isn't held back for them
     try:
-        import subprocess
-        status_output = run_git_command_output(target_dir, "status", "--short")
-        if status_output.strip():
-            print("\nAvailable changes:")
-            print(status_output)
-        else:
-            print("\nNo uncommitted changes found.")
+        status_output = status_future.result(timeout=_STATUS_WAIT)
+    except TimeoutError:
+        sys.stdout.write("\n(Still collecting changes; run `git status` to list them.)\n")
     except Exception:
         pass
-    
-    print("\nEnter files/paths to commit (space-separated, or '.' for all files):")
-    print("Examples:")
-    print("  - Press Enter or type '.' for all files")
-    print("  - 'file1.py file2.py' for specific files")
-    print("  - 'src/' for a directory")
-    print("  - '*.py' for all Python files")
-    
+    else:
+        if status_output.strip():
+            sys.stdout.write(f"\nAvailable changes:\n{status_output}\n")
+        else:
+            sys.stdout.write("\nNo uncommitted changes found.\n")
+    sys.stdout.flush()
+
     user_input = inquirer.text(message="Files to commit:", default=".").execute().strip()
     
     if not user_input or user_input == '.':
@@ -46,16 +83,18 @@ def prompt_for_files(target_dir: Path) -> str:
 
 def prompt_for_model() -> str:
     """Prompt user for model selection using model_picker's interactive selector."""
-    try:
-        from ai_auto_commit.models import get_default_model
-    except ImportError:
-        from models import get_default_model
+    if not _stdin_is_tty():
+        from .models import get_default_model
+
+        return get_default_model()
+
+    # One write for the banner, flushed before the picker takes over the terminal
+    sys.stdout.write(f"\n{_SEP}\n🤖 Model Selection\n{_SEP}\n")
+    sys.stdout.flush()
 
     from ai_model_picker import select_provider, select_model
 
-    print("\n" + "=" * 60)
-    print("🤖 Model Selection")
-    print("=" * 60)
+    from .models import get_default_model
 
     provider = select_provider("Select AI Provider")
     if not provider:
@@ -69,7 +108,9 @@ def prompt_for_model() -> str:
     return get_default_model()
 
 
-def prompt_for_commit_comment(commit_msg: str, non_interactive: bool = False) -> str:
+def prompt_for_commit_comment(
+    commit_msg: str, non_interactive: bool = False, comment: Optional[str] = None
+) -> str:
     """
     Prompt user for optional comment to add to the commit message.
     
@@ -78,35 +119,44 @@ def prompt_for_commit_comment(commit_msg: str, non_interactive: bool = False) ->
     commit_msg : str
         The AI-generated commit message.
     non_interactive : bool
-        If True, do not prompt for user input.
+        If True, do not prompt for user input. Also implied when stdin is
+        not a terminal.
+    comment : str, optional
+        Comment given up front (e.g. `--comment`); it is added to the top of
+        the message without prompting.
     
     Returns
     -------
     str
         The final commit message (with optional user comment added).
     """
-    print("\n" + "=" * 60)
-    print("📝 Generated Commit Message")
-    print("=" * 60)
-    print(commit_msg)
-    print("=" * 60)
+    banner = f"\n{_SEP}\n📝 Generated Commit Message\n{_SEP}\n{commit_msg}\n{_SEP}\n"
 
-    if non_interactive:
+    if comment and comment.strip():
+        final_commit_msg = f"{comment.strip()}\n\n{commit_msg}"
+        sys.stdout.write(f"\n📋 Final commit message:\n{_SEP}\n{final_commit_msg}\n{_SEP}\n")
+        return final_commit_msg
+
+    if non_interactive or not _stdin_is_tty():
+        sys.stdout.write(banner)
         return commit_msg
+
+    from InquirerPy import inquirer
     
-    print("\nYou can add a comment to the top of this commit message.")
-    print("This is useful for adding context, notes, or special instructions.")
-    print("Press Enter to proceed with the message as-is, or type a comment.")
+    sys.stdout.write(
+        banner
+        + "\nYou can add a comment to the top of this commit message.\n"
+        "This is useful for adding context, notes, or special instructions.\n"
+        "Press Enter to proceed with the message as-is, or type a comment.\n"
+    )
+    sys.stdout.flush()
     
     user_comment = inquirer.text(message="Enter comment (or press Enter to skip):").execute().strip()
     
     if user_comment:
         # Add the user comment to the top of the commit message
         final_commit_msg = f"{user_comment}\n\n{commit_msg}"
-        print("\n📋 Final commit message:")
-        print("=" * 60)
-        print(final_commit_msg)
-        print("=" * 60)
+        sys.stdout.write(f"\n📋 Final commit message:\n{_SEP}\n{final_commit_msg}\n{_SEP}\n")
         return final_commit_msg
     else:
         return commit_msg
@@ -116,11 +166,17 @@ def confirm_commit_and_push(
     target_dir: Path, commit_msg: str, remote: str
 ) -> tuple[bool, str]:
     """Ask user to confirm the commit message and path before pushing."""
-    print(f"\nRepository path: {target_dir}")
-    print(f"Commit message: {commit_msg}")
+    if not _stdin_is_tty():
+        return True, commit_msg
+
+    from InquirerPy import inquirer
+    from InquirerPy.base.control import Choice
+
+    sys.stdout.write(f"\nRepository path: {target_dir}\nCommit message: {commit_msg}\n")
+    sys.stdout.flush()
     
     action = inquirer.select(
-        message="Is this git commit and path correct?",
+        message=_CONFIRM_QUESTION,
         choices=[
             Choice(value="yes", name="Yes - commit and push"),
             Choice(value="comment", name="Add a comment first"),
@@ -137,10 +193,10 @@ def confirm_commit_and_push(
         manual_comment = inquirer.text(message="Enter your manual comment:").execute().strip()
         if manual_comment:
             enhanced_commit_msg = f"{manual_comment}\n\n{commit_msg}"
-            print(f"\n📋 Enhanced commit message:")
-            print("=" * 50)
-            print(enhanced_commit_msg)
-            print("=" * 50)
+            sys.stdout.write(
+                f"\n📋 Enhanced commit message:\n{_RULE}\n{enhanced_commit_msg}\n{_RULE}\n"
+            )
+            sys.stdout.flush()
 
             proceed = inquirer.confirm(
                 message="Proceed with this enhanced commit message?", default=True
@@ -150,24 +206,196 @@ def confirm_commit_and_push(
             return True, commit_msg
 
 
-def main() -> None:
-    """Main CLI entry point."""
-    import argparse
-    import os
-    import subprocess
-    # Import here to avoid circular imports
-    from ai_auto_commit.ai_auto_commit import auto_commit_and_push
-    from ai_auto_commit.api_client import init
-    from ai_auto_commit.models import (
-        get_config,
+def _render_config(config: dict) -> None:
+    """Print the current configuration, deriving every value from `config`."""
+    from .models import (
         get_config_path,
         get_default_model,
         get_model_config,
         get_token_budget,
-        set_default_model,
-        set_token_budget,
     )
+
+    default_model = get_default_model(config)
     
+    print("📋 Current Configuration")
+    print("=" * 60)
+    print(f"Config file: {get_config_path()}")
+    print(f"Default model: {default_model}")
+    model_config = get_model_config(default_model)
+    if model_config:
+        print(f"  → {model_config.display_name} ({model_config.description})")
+    print(f"Token budget: {get_token_budget(config):,} tokens")
+    if config:
+        print("\nAll settings:")
+        for key, value in sorted(config.items()):
+            print(f"  {key}: {value}")
+    else:
+        print("\n(Using default settings)")
+
+
+def _set_default_model(model_name: str) -> None:
+    """Persist the default model, reporting whether it is a known model."""
+    from .models import get_model_config, set_default_model
+
+    model_config = get_model_config(model_name)
+    if model_config:
+        print(f"✅ Setting default model to: {model_config.display_name} ({model_name})")
+    else:
+        print(f"✅ Setting default model to: {model_name} (custom model)")
+
+    set_default_model(model_name)
+    print(f"Default model saved. It will be used when no --model is specified.")
+
+
+def _fast_set_default_model(argv: list[str]) -> Optional[str]:
+    """Return MODEL for a bare `--set-default-model MODEL` invocation.
+
+    Lets that quick configuration command skip building the argparse parser
+    and importing the commit pipeline. Anything else returns None and goes
+    through the full parser.
+    """
+    if len(argv) == 2 and argv[0] == "--set-default-model" and not argv[1].startswith("-"):
+        return argv[1]
+    if len(argv) == 1 and argv[0].startswith("--set-default-model="):
+        return argv[0].partition("=")[2] or None
+    return None
+
+
+def _run_setup_wizard() -> None:
+    """Handle `init`: run the interactive setup wizard."""
+    from .setup import setup_wizard
+
+    setup_wizard()
+
+
+def _config_get() -> None:
+    """Handle `config get`."""
+    from .models import get_config
+
+    # One config load serves every setting shown
+    _render_config(get_config())
+
+
+def _config_set(key: str, value: str) -> None:
+    """Handle `config set KEY VALUE`."""
+    if key == "model":
+        from .models import get_model_config, set_default_model
+
+        model_name = value
+        model_config = get_model_config(model_name)
+        if model_config:
+            print(f"✅ Setting default model to: {model_config.display_name} ({model_name})")
+        else:
+            print(f"✅ Setting default model to: {model_name} (custom model)")
+        set_default_model(model_name)
+        print("Default model saved.")
+
+    elif key == "token-budget":
+        from .models import set_token_budget
+
+        try:
+            budget = int(value)
+            if budget <= 0:
+                print("❌ Error: Token budget must be a positive integer")
+                sys.exit(1)
+            set_token_budget(budget)
+            print(f"✅ Token budget set to: {budget:,} tokens")
+        except ValueError:
+            print("❌ Error: Token budget must be a valid integer")
+            sys.exit(1)
+
+
+def _config_edit() -> None:
+    """Handle `config edit`: open the config file in an editor."""
+    from .models import get_config_path, get_editor, set_editor
+
+    # Open config file in default editor
+    config_path = get_config_path()
+
+    # Ensure config file exists: create an empty one unless it's already there
+    config_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        with open(config_path, "x") as f:
+            json.dump({}, f, indent=2)
+    except FileExistsError:
+        pass
+
+    # Determine editor: environment first, then the editor found on a
+    # previous run (if still installed), then probe common editors
+    editor = os.environ.get("EDITOR") or os.environ.get("VISUAL")
+    if not editor:
+        editor = get_editor()
+        if editor and not shutil.which(editor):
+            editor = None
+    if not editor:
+        # Try common editors (a PATH lookup, no `which` subprocesses)
+        editor = next(
+            (ed for ed in ("nano", "vim", "vi", "code", "subl") if shutil.which(ed)),
+            None,
+        )
+        if editor:
+            # Saved before the editor runs so the user's edits are
+            # never overwritten afterwards
+            set_editor(editor)
+
+    if not editor:
+        print("❌ Error: No editor found. Please set EDITOR or VISUAL environment variable.")
+        print(f"Config file location: {config_path}")
+        sys.exit(1)
+
+    # Open editor
+    try:
+        subprocess.run([editor, str(config_path)], check=True)
+        print(f"✅ Configuration file opened in {editor}")
+        print(f"Config file: {config_path}")
+    except subprocess.CalledProcessError:
+        print(f"❌ Error: Failed to open editor {editor}")
+        print(f"Config file location: {config_path}")
+        sys.exit(1)
+    except FileNotFoundError:
+        print(f"❌ Error: Editor '{editor}' not found")
+        print(f"Config file location: {config_path}")
+        sys.exit(1)
+
+
+# Keys accepted by `config set`
+_CONFIG_KEYS = ("model", "token-budget")
+
+
+def _dispatch_light(argv: list[str]) -> bool:
+    """Run simple configuration commands without building the argparse parser.
+
+    Only exact, well-formed invocations are handled (`init`, `config get`,
+    `config edit`, `config set KEY VALUE` and `--set-default-model MODEL`).
+    Returns False for anything else, including help requests and typos, so
+    those go through the full parser and get its usual messages.
+    """
+    model_name = _fast_set_default_model(argv)
+    if model_name is not None:
+        _set_default_model(model_name)
+    elif argv == ["init"]:
+        _run_setup_wizard()
+    elif argv == ["config", "get"]:
+        _config_get()
+    elif argv == ["config", "edit"]:
+        _config_edit()
+    elif (
+        len(argv) == 4
+        and argv[:2] == ["config", "set"]
+        and argv[2] in _CONFIG_KEYS
+        and not argv[3].startswith("-")
+    ):
+        _config_set(argv[2], argv[3])
+    else:
+        return False
+    return True
+
+
+def main() -> None:
+    """Main CLI entry point."""
+    if _dispatch_light(sys.argv[1:]):
+        return
+
     parser = argparse.ArgumentParser(
         description="AI-powered git commit and push tool with interactive prompts",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -176,6 +404,7 @@ Examples:
   %(prog)s init                     # Run interactive setup wizard (first time)
   %(prog)s                          # Generate commit from staged files
   %(prog)s --model gpt-4o           # Use GPT-4o model (instead of default)
+  %(prog)s --yes                    # Accept every default, no prompts (scripts/CI)
   %(prog)s config set model gpt-4o  # Set default model
   %(prog)s config set token-budget 500000  # Set token budget
   %(prog)s config get               # Show current configuration
@@ -217,7 +446,7 @@ Note: Run 'autocommit init' for first-time setup.
     )
     config_set_parser.add_argument(
         "key",
-        choices=["model", "token-budget"],
+        choices=_CONFIG_KEYS,
         help="Configuration key to set"
     )
     config_set_parser.add_argument(
@@ -239,14 +468,12 @@ Note: Run 'autocommit init' for first-time setup.
         help="API key for the selected provider (if not provided, uses environment variables)"
     )
     
-    # Provider choices from model_picker (same as provider_models.json)
-    from ai_auto_commit.models import get_all_providers
-    _provider_choices = get_all_providers()
+    # Provider choices come from model_picker (provider_models.json); they are
+    # checked after parsing so `--help` and the subcommands don't load it
     parser.add_argument(
         "--provider",
         type=str,
         default="openai",
-        choices=_provider_choices,
         help="AI provider to use (default: openai). Choices from model_picker."
     )
     
@@ -294,140 +521,84 @@ Note: Run 'autocommit init' for first-time setup.
         default=False,
         help="Run in non-interactive mode. Do not prompt for user input."
     )
+
+    parser.add_argument(
+        "--yes", "-y",
+        action="store_true",
+        default=False,
+        help="Answer every prompt with its default: no comment prompt, split & "
+             "summarize for large diffs, and push recovery without confirmation. "
+             "Implies --non-interactive and --auto-recover."
+    )
+
+    parser.add_argument(
+        "--comment",
+        type=str,
+        default=None,
+        help="Comment to add to the top of the generated commit message "
+             "(skips the comment prompt)"
+    )
+
+    parser.add_argument(
+        "--force-llm",
+        action="store_true",
+        default=False,
+        help="Always generate a fresh message with the model, even for trivial or cached changes."
+    )
     
     args = parser.parse_args()
 
     # Handle init subcommand
     if args.command == "init":
-        from ai_auto_commit.setup import setup_wizard
-        setup_wizard()
+        _run_setup_wizard()
         return
     # Handle config subcommand
     if args.command == "config":
         if args.config_action == "get":
-            # Show current configuration
-            config = get_config()
-            default_model = get_default_model()
-            token_budget = get_token_budget()
-            config_path = get_config_path()
-            
-            print("📋 Current Configuration")
-            print("=" * 60)
-            print(f"Config file: {config_path}")
-            print(f"Default model: {default_model}")
-            model_config = get_model_config(default_model)
-            if model_config:
-                print(f"  → {model_config.display_name} ({model_config.description})")
-            print(f"Token budget: {token_budget:,} tokens")
-            if config:
-                print("\nAll settings:")
-                for key, value in sorted(config.items()):
-                    print(f"  {key}: {value}")
-            else:
-                print("\n(Using default settings)")
-            return
-        
+            _config_get()
         elif args.config_action == "set":
-            if args.key == "model":
-                model_name = args.value
-                model_config = get_model_config(model_name)
-                if model_config:
-                    print(f"✅ Setting default model to: {model_config.display_name} ({model_name})")
-                else:
-                    print(f"✅ Setting default model to: {model_name} (custom model)")
-                set_default_model(model_name)
-                print("Default model saved.")
-            
-            elif args.key == "token-budget":
-                try:
-                    budget = int(args.value)
-                    if budget <= 0:
-                        print("❌ Error: Token budget must be a positive integer")
-                        sys.exit(1)
-                    set_token_budget(budget)
-                    print(f"✅ Token budget set to: {budget:,} tokens")
-                except ValueError:
-                    print("❌ Error: Token budget must be a valid integer")
-                    sys.exit(1)
-            return
-        
+            _config_set(args.key, args.value)
         elif args.config_action == "edit":
-            # Open config file in default editor
-            config_path = get_config_path()
-            
-            # Ensure config file exists
-            if not config_path.exists():
-                # Create empty config
-                config_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(config_path, "w") as f:
-                    import json
-                    json.dump({}, f, indent=2)
-            
-            # Determine editor
-            editor = os.environ.get("EDITOR") or os.environ.get("VISUAL")
-            if not editor:
-                # Try common editors
-                for ed in ["nano", "vim", "vi", "code", "subl"]:
-                    if subprocess.run(["which", ed], capture_output=True).returncode == 0:
-                        editor = ed
-                        break
-            
-            if not editor:
-                print("❌ Error: No editor found. Please set EDITOR or VISUAL environment variable.")
-                print(f"Config file location: {config_path}")
-                sys.exit(1)
-            
-            # Open editor
-            try:
-                subprocess.run([editor, str(config_path)], check=True)
-                print(f"✅ Configuration file opened in {editor}")
-                print(f"Config file: {config_path}")
-            except subprocess.CalledProcessError:
-                print(f"❌ Error: Failed to open editor {editor}")
-                print(f"Config file location: {config_path}")
-                sys.exit(1)
-            except FileNotFoundError:
-                print(f"❌ Error: Editor '{editor}' not found")
-                print(f"Config file location: {config_path}")
-                sys.exit(1)
-            return
-        
+            _config_edit()
         else:
             config_parser.print_help()
-            return
+        return
     
     # Handle --set-default-model flag (exit early if set)
     if args.set_default_model:
-        model_name = args.set_default_model
-        # Validate model if it's a known model
-        model_config = get_model_config(model_name)
-        if model_config:
-            print(f"✅ Setting default model to: {model_config.display_name} ({model_name})")
-        else:
-            print(f"✅ Setting default model to: {model_name} (custom model)")
-        
-        set_default_model(model_name)
-        print(f"Default model saved. It will be used when no --model is specified.")
+        _set_default_model(args.set_default_model)
         return
+
+    from .models import get_all_providers
+
+    provider_choices = get_all_providers()
+    if args.provider not in provider_choices:
+        parser.error(
+            f"argument --provider: invalid choice: {args.provider!r} "
+            f"(choose from {', '.join(map(repr, provider_choices))})"
+        )
     
     try:
         print("🚀 AI Auto Commit Tool")
         print("=" * 60)
         
-        # Initialize API key
-        from ai_auto_commit.api_client import init
-        if args.api_key:
-            init(api_key=args.api_key, provider=args.provider)
-        else:
-            # Initialize from config file or environment
-            init(provider=args.provider)
+        # The commit pipeline and LLM clients are only needed from here on
+        from .ai_auto_commit import auto_commit_and_push
+        from .api_client import init
+
+        # Initialize API keys: the explicit --api-key (if any) on top of the
+        # config file and environment
+        init(api_key=args.api_key, provider=args.provider)
         
         commit_msg = auto_commit_and_push(
             model=args.model,
             temperature=args.temperature,
             remote=args.remote,
-            auto_recover_push=args.auto_recover,
-            non_interactive=args.non_interactive,
+            large_diff_strategy="split" if args.yes else None,
+            auto_recover_push=args.auto_recover or args.yes,
+            non_interactive=args.non_interactive or args.yes,
+            force_llm=args.force_llm,
+            comment=args.comment,
         )
         
         print("\n" + "=" * 60)
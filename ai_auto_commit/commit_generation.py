@@ -2,49 +2,90 @@
 
 from __future__ import annotations
 
-import concurrent.futures
-from typing import List
-
-# Import modules - handle both package and direct script execution
-try:
-    from .api_client import check_network_connectivity, generate_fallback_commit_message
-    from .llm_client import get_token_usage, invoke_llm
-    from .prompts import PROMPT_HEADER
-    from .token_budget import get_max_token_budget, refund_tokens, try_reserve_tokens
-    from .token_utils import token_len
-except ImportError:
-    from api_client import check_network_connectivity, generate_fallback_commit_message
-    from llm_client import get_token_usage, invoke_llm
-    from prompts import PROMPT_HEADER
-    from token_budget import get_max_token_budget, refund_tokens, try_reserve_tokens
-    from token_utils import token_len
+import asyncio
+import re
+import time
+from typing import List, Optional
+
+from .api_client import check_network_connectivity, generate_fallback_commit_message
+from .heuristic_commits import classify_chunk
+from .llm_client import ainvoke_llm, get_token_usage, invoke_llm
+from .prompts import PROMPT_HEADER
+from .response_cache import get_cached_response, response_key, store_response
+from .token_budget import get_max_token_budget, refund_tokens, try_reserve_tokens
+from .token_utils import token_len
+
+
+_FILE_HEADER_RE = re.compile(r"^diff --git ", re.MULTILINE)
 
 
 def split_diff_by_file(diff: str) -> List[str]:
-    """Return list of 'diff --git ...' chunks."""
-    CHUNK_HEADER = "diff --git "
-    parts = diff.split(CHUNK_HEADER)
-    # first element before the first header is '' – drop it
-    return [CHUNK_HEADER + p for p in parts[1:]]
+    """Return list of 'diff --git ...' chunks.
 
+    Chunks are sliced straight out of `diff` between header offsets, so the
+    diff is copied once. Only headers at the start of a line count, which
+    keeps a diff of a patch file (`+diff --git ...`) in one chunk.
+    """
+    starts = [m.start() for m in _FILE_HEADER_RE.finditer(diff)]
+    # anything before the first header is dropped
+    return [diff[start:end] for start, end in zip(starts, starts[1:] + [len(diff)])]
+
+
+# Stage-1 instruction; each file's diff is appended to it
+_SUMMARY_PROMPT = (
+    "Summarise the following git diff in ONE bullet (max 20 words); "
+    "start bullet with a verb (Add, Fix, Refactor …):\n\n"
+)
+
+# Characters per token assumed when a chunk is sized without the tokenizer
+_CHARS_PER_TOKEN = 4
+
+# Stage-1 summaries in flight at once; keeps large diffs under provider rate limits
+STAGE1_CONCURRENCY = 32
+
+
+def _summary_prompt_tokens(chunk: str) -> int:
+    """Token estimate for a stage-1 prompt, measuring only the chunk itself.
+
+    The fixed instruction is counted once (`token_len` is memoized).
+    """
+    return token_len(_SUMMARY_PROMPT) + token_len(chunk)
 
-def summarise_file_diff(chunk: str, model: str, temperature: float) -> str:
-    """Call OpenAI once for a single-file diff and return 1-line summary."""
-    prompt = (
-        "Summarise the following git diff in ONE bullet (max 20 words); "
-        "start bullet with a verb (Add, Fix, Refactor …):\n\n" + chunk
-    )
+
+# Kind under which stage-1 bullets are kept in the response cache
+_BULLET_KIND = "bullet"
+
+
+def _fallback_bullet(chunk: str) -> str:
+    """Cheap local summary used when a chunk can't be sent to the model."""
+    if "diff --git" in chunk:
+        file_path = chunk.splitlines()[0].split()[-1]
+        return f"- Update {file_path}"
+    return "- Update file"
+
+
+def summarise_file_diff(
+    chunk: str, model: str, temperature: float, use_cache: bool = True
+) -> str:
+    """Call OpenAI once for a single-file diff and return 1-line summary.
+
+    A bullet produced for the same chunk, model and temperature on an
+    earlier run is reused without a request or a token reservation, unless
+    `use_cache` is False.
+    """
+    key = response_key(chunk, model, temperature)
+    cached = get_cached_response(_BULLET_KIND, key) if use_cache else None
+    if cached is not None:
+        return cached
+    prompt = _SUMMARY_PROMPT + chunk
 
     # 🛡️ estimate: prompt tokens + ≤64 completion tokens
-    est_prompt = token_len(prompt)
+    est_prompt = _summary_prompt_tokens(chunk)
     est_completion = 64
     est_total = est_prompt + est_completion
     if not try_reserve_tokens(est_total):
         # Budget exhausted – fall back to a cheap, local summary
-        if "diff --git" in chunk:
-            file_path = chunk.splitlines()[0].split()[-1]
-            return f"- Update {file_path}"
-        return "- Update file"
+        return _fallback_bullet(chunk)
 
     try:
         content = invoke_llm(
@@ -53,26 +94,204 @@ def summarise_file_diff(chunk: str, model: str, temperature: float) -> str:
             temperature=temperature,
             max_tokens=est_completion,
         )
-        
-        # Estimate actual token usage
+    except Exception as e:
+        refund_tokens(est_total)  # nothing spent if request failed
+        print(f"  → Warning: Failed to summarize file diff: {e}")
+        return _fallback_bullet(chunk)
+    return _settle_bullet(key, model, prompt, content, est_prompt, est_total)
+
+
+async def asummarise_file_diff(
+    chunk: str,
+    model: str,
+    temperature: float,
+    limit: asyncio.Semaphore,
+    use_cache: bool = True,
+) -> str:
+    """Async `summarise_file_diff`; at most `limit` requests run at once."""
+    key = response_key(chunk, model, temperature)
+    cached = get_cached_response(_BULLET_KIND, key) if use_cache else None
+    if cached is not None:
+        return cached
+    prompt = _SUMMARY_PROMPT + chunk
+
+    est_prompt = _summary_prompt_tokens(chunk)
+    est_completion = 64
+    est_total = est_prompt + est_completion
+    # Reserved only once a slot is free, so waiting requests hold no budget
+    async with limit:
+        if not try_reserve_tokens(est_total):
+            return _fallback_bullet(chunk)
+        try:
+            content = await ainvoke_llm(
+                model_name=model,
+                prompt=prompt,
+                temperature=temperature,
+                max_tokens=est_completion,
+            )
+        except Exception as e:
+            refund_tokens(est_total)  # nothing spent if request failed
+            print(f"  → Warning: Failed to summarize file diff: {e}")
+            return _fallback_bullet(chunk)
+        return _settle_bullet(key, model, prompt, content, est_prompt, est_total)
+
+
+def _settle_bullet(
+    key: str, model: str, prompt: str, content: str, est_prompt: int, est_total: int
+) -> str:
+    """Refund any over-estimate for a stage-1 call, then format and cache its bullet."""
+    # Estimate actual token usage (the prompt was already measured for the reservation)
+    prompt_tokens, completion_tokens = get_token_usage(
+        model, prompt, content, prompt_tokens=est_prompt
+    )
+    real_spent = prompt_tokens + completion_tokens
+    if real_spent < est_total:  # we over-estimated – refund the diff
+        refund_tokens(est_total - real_spent)
+
+    if content:
+        bullet = "- " + content.strip().lstrip("-• ")
+        store_response(_BULLET_KIND, key, bullet)
+        return bullet
+    return "- Update file"
+
+
+def _group_bullets(bullets: List[str]) -> str:
+    """Join bullets grouped by their leading verb (Add, Fix, ...).
+
+    Groups appear in order of first occurrence and keep their bullets in
+    the order given; a linear pass instead of sorting every bullet.
+    """
+    groups: dict[str, List[str]] = {}
+    for bullet in bullets:
+        verb = (bullet[2:].split(None, 1) or [""])[0].lower()
+        groups.setdefault(verb, []).append(bullet)
+    return "\n".join(bullet for group in groups.values() for bullet in group)
+
+
+# Chunks up to this many tokens are packed several to a request, into
+# batches of at most _BATCH_TOKENS
+_BATCH_CHUNK_TOKENS = 1_000
+_BATCH_TOKENS = 4_000
+_BATCH_PROMPT = (
+    "Summarise each git diff below in ONE bullet (max 20 words); "
+    "start each bullet with a verb (Add, Fix, Refactor …). "
+    "Answer with exactly one line per diff, in the form `<FILE n>: bullet`.\n\n"
+)
+_BATCH_ANSWER_RE = re.compile(r"^\W*<FILE (\d+)>:?\s*(.+?)\s*$", re.MULTILINE)
+
+
+def _pack_batches(sizes: dict[int, int]) -> List[List[int]]:
+    """First-fit-decreasing packing of chunk indices into _BATCH_TOKENS bins."""
+    batches: List[List[int]] = []
+    room: List[int] = []
+    for index in sorted(sizes, key=sizes.__getitem__, reverse=True):
+        for b, free in enumerate(room):
+            if sizes[index] <= free:
+                batches[b].append(index)
+                room[b] -= sizes[index]
+                break
+        else:
+            batches.append([index])
+            room.append(_BATCH_TOKENS - sizes[index])
+    return batches
+
+
+async def asummarise_batch(
+    chunks: List[str], model: str, temperature: float, limit: asyncio.Semaphore
+) -> List[Optional[str]]:
+    """Summarise several small chunks with one request.
+
+    Returns a bullet per chunk, or None for a chunk the answer left out (the
+    caller summarises those on their own).
+    """
+    prompt = _BATCH_PROMPT + "".join(
+        f"<FILE {n}>\n{chunk}\n<END {n}>\n" for n, chunk in enumerate(chunks, 1)
+    )
+    est_prompt = token_len(_BATCH_PROMPT) + sum(token_len(c) + 12 for c in chunks)
+    est_completion = 64 * len(chunks)
+    est_total = est_prompt + est_completion
+    # Reserved only once a slot is free, so waiting requests hold no budget
+    async with limit:
+        if not try_reserve_tokens(est_total):
+            return [_fallback_bullet(chunk) for chunk in chunks]
+        try:
+            content = await ainvoke_llm(
+                model_name=model,
+                prompt=prompt,
+                temperature=temperature,
+                max_tokens=est_completion,
+            )
+        except Exception as e:
+            refund_tokens(est_total)  # nothing spent if request failed
+            print(f"  → Warning: Failed to summarize file diffs: {e}")
+            return [None] * len(chunks)
+
+        # Measured in full: est_prompt includes a margin for the file markers
         prompt_tokens, completion_tokens = get_token_usage(model, prompt, content)
         real_spent = prompt_tokens + completion_tokens
-        if real_spent < est_total:  # we over-estimated – refund the diff
+        if real_spent < est_total:
             refund_tokens(est_total - real_spent)
-        
-        if content:
-            return "- " + content.strip().lstrip("-• ")
-        else:
-            return "- Update file"
 
-    except Exception as e:
-        refund_tokens(est_total)  # nothing spent if request failed
-        print(f"  → Warning: Failed to summarize file diff: {e}")
-        # Same generic fallback as before …
-        if "diff --git" in chunk:
-            file_path = chunk.splitlines()[0].split()[-1]
-            return f"- Update {file_path}"
-        return "- Update file"
+    bullets: List[Optional[str]] = [None] * len(chunks)
+    for match in _BATCH_ANSWER_RE.finditer(content or ""):
+        n = int(match.group(1))
+        text = match.group(2).lstrip("-• ")
+        if 1 <= n <= len(chunks) and text and bullets[n - 1] is None:
+            bullets[n - 1] = "- " + text
+            key = response_key(chunks[n - 1], model, temperature)
+            store_response(_BULLET_KIND, key, bullets[n - 1])
+    return bullets
+
+
+def summarise_file_diffs(
+    chunks: List[str], model: str, temperature: float, use_cache: bool = True
+) -> List[str]:
+    """Stage 1: summarise every chunk concurrently, one bullet per chunk (in order).
+
+    Renames, lock files and whitespace-only edits are described locally.
+    Small, not yet cached chunks are batched several to a request; larger
+    ones (and anything a batched answer missed) get a request of their own.
+    With `use_cache` False, bullets cached by earlier runs are ignored.
+    """
+
+    async def run() -> List[str]:
+        limit = asyncio.Semaphore(STAGE1_CONCURRENCY)
+        bullets: List[Optional[str]] = [classify_chunk(chunk) for chunk in chunks]
+        small: dict[int, int] = {}
+        for i, chunk in enumerate(chunks):
+            if bullets[i] is not None:
+                continue
+            size = token_len(chunk)
+            if size <= _BATCH_CHUNK_TOKENS:
+                if use_cache:
+                    key = response_key(chunk, model, temperature)
+                    bullets[i] = get_cached_response(_BULLET_KIND, key)
+                if bullets[i] is None:
+                    small[i] = size
+        batches = [batch for batch in _pack_batches(small) if len(batch) > 1]
+
+        async def batch(indices: List[int]) -> None:
+            answers = await asummarise_batch(
+                [chunks[i] for i in indices], model, temperature, limit
+            )
+            for i, bullet in zip(indices, answers):
+                bullets[i] = bullet
+
+        async def single(i: int) -> None:
+            bullets[i] = await asummarise_file_diff(
+                chunks[i], model, temperature, limit, use_cache
+            )
+
+        batched = {i for indices in batches for i in indices}
+        await asyncio.gather(
+            *(batch(indices) for indices in batches),
+            *(single(i) for i in range(len(chunks)) if bullets[i] is None and i not in batched),
+        )
+        # Chunks a batched answer didn't cover
+        await asyncio.gather(*(single(i) for i in range(len(chunks)) if bullets[i] is None))
+        return bullets
+
+    return asyncio.run(run())
 
 
 def estimate_stage1_budget(
@@ -86,18 +305,18 @@ def estimate_stage1_budget(
     sample_size = min(10, len(chunks))
     sample_chunks = chunks[:sample_size]
     
+    # A rough average is enough here, so chunks are sized at ~4 characters
+    # per token (typical BPE for code) instead of being tokenized; the real
+    # count is taken when each chunk's tokens are reserved
+    header_tokens = token_len(_SUMMARY_PROMPT)
     total_sample_tokens = 0
     for chunk in sample_chunks:
-        prompt = (
-            "Summarise the following git diff in ONE bullet (max 20 words); "
-            "start bullet with a verb (Add, Fix, Refactor …):\n\n" + chunk
-        )
-        total_sample_tokens += token_len(prompt) + 64  # prompt + estimated completion
+        # prompt + estimated completion
+        total_sample_tokens += header_tokens + len(chunk) // _CHARS_PER_TOKEN + 64
     
     avg_tokens_per_file = total_sample_tokens / sample_size
     
     # Reserve some budget for stage-2 (about 10% of total budget)
-    from .token_budget import get_max_token_budget
     max_budget = get_max_token_budget()
     stage2_reserve = max_budget // 10
     available_for_stage1 = max_budget - stage2_reserve
@@ -111,7 +330,8 @@ def sampled_commit_message(
     chunks: List[str], 
     model: str, 
     temperature: float, 
-    max_files: int
+    max_files: int,
+    use_cache: bool = True,
 ) -> str:
     """Generate commit message using a smart sampling of files."""
     
@@ -126,14 +346,7 @@ def sampled_commit_message(
     print(f"  → Selected {len(selected_chunks)} largest files for analysis")
     
     # Generate summaries for selected files
-    bullets: List[str] = []
-    
-    def summarize_chunk(chunk: str) -> str:
-        return summarise_file_diff(chunk, model, temperature)
-    
-    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
-        for bullet in pool.map(summarize_chunk, selected_chunks):
-            bullets.append(bullet)
+    bullets = summarise_file_diffs(selected_chunks, model, temperature, use_cache)
     
     # Add a summary bullet for the remaining files
     remaining_count = len(chunks) - len(selected_chunks)
@@ -141,7 +354,7 @@ def sampled_commit_message(
         bullets.append(f"- Update {remaining_count} additional files")
     
     # Stage 2: final commit message
-    bullets_text = "\n".join(sorted(bullets))
+    bullets_text = _group_bullets(bullets)
     prompt = (
         PROMPT_HEADER
         + "\nBelow are per-file bullets (sampled from largest files). "
@@ -165,7 +378,9 @@ def sampled_commit_message(
     )
     
     # Estimate actual token usage
-    prompt_tokens, completion_tokens = get_token_usage(model, prompt, content)
+    prompt_tokens, completion_tokens = get_token_usage(
+        model, prompt, content, prompt_tokens=est_prompt
+    )
     real_spent = prompt_tokens + completion_tokens
     if real_spent < est_prompt + est_completion:
         refund_tokens((est_prompt + est_completion) - real_spent)
@@ -181,24 +396,18 @@ def hierarchical_commit_message(
     full_diff: str,
     model: str = "gpt-4o-mini",
     temperature: float = 0.2,
+    use_cache: bool = True,
 ) -> str:
     """Stage-1 file bullets ➜ Stage-2 final Conventional Commit."""
     try:
         chunks = split_diff_by_file(full_diff)
         print(f"Summarising {len(chunks)} file diffs…")
 
-        # Stage 1: parallel bullet generation (threadpool keeps it simple)
-        bullets: List[str] = []
-        
-        def summarize_chunk(chunk: str) -> str:
-            return summarise_file_diff(chunk, model, temperature)
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
-            for bullet in pool.map(summarize_chunk, chunks):
-                bullets.append(bullet)
+        # Stage 1: concurrent bullet generation
+        bullets = summarise_file_diffs(chunks, model, temperature, use_cache)
 
         # Stage 2: final commit message
-        bullets_text = "\n".join(sorted(bullets))  # crude grouping heuristic
+        bullets_text = _group_bullets(bullets)  # crude grouping heuristic
         prompt = (
             PROMPT_HEADER
             + "\nBelow are per-file bullets. Write the final Conventional "
@@ -222,7 +431,9 @@ def hierarchical_commit_message(
         )
         
         # Estimate actual token usage
-        prompt_tokens, completion_tokens = get_token_usage(model, prompt, content)
+        prompt_tokens, completion_tokens = get_token_usage(
+            model, prompt, content, prompt_tokens=est_prompt
+        )
         real_spent = prompt_tokens + completion_tokens
         if real_spent < est_prompt + est_completion:
             refund_tokens((est_prompt + est_completion) - real_spent)
@@ -249,19 +460,20 @@ def hierarchical_commit_message(
         return generate_commit_message_with_retry(full_prompt, model, temperature)
 
 
+# Markdown code fence at the start or end of a model reply
+_FENCE_RE = re.compile(r"^```|```$")
+_NETWORK_ERROR_TOKENS = ("connection", "timeout")
+
+
 def generate_commit_message_with_retry(
     full_prompt: str, model: str, temperature: float, max_retries: int = 3
 ) -> str:
-    """Generate commit message with retry logic for network issues."""
-    import time
-    
-    # Check network connectivity first (using OpenAI as a default check)
-    print("Checking network connectivity...")
-    if not check_network_connectivity():
-        print("Warning: Cannot connect to API server. Network may be down.")
-        print("Using fallback commit message.")
-        return generate_fallback_commit_message()
-    
+    """Generate commit message with retry logic for network issues.
+
+    The first attempt doubles as the connectivity check; the (cached)
+    network probe only runs after a network error, to skip the remaining
+    retries when the API server is unreachable.
+    """
     for attempt in range(max_retries):
         prompt_tokens: int = 0
         est_completion: int = 192
@@ -284,22 +496,15 @@ def generate_commit_message_with_retry(
             
             # Estimate actual token usage
             actual_prompt_tokens, actual_completion_tokens = get_token_usage(
-                model, full_prompt, content
+                model, full_prompt, content, prompt_tokens=prompt_tokens
             )
             real_spent = actual_prompt_tokens + actual_completion_tokens
             if real_spent < prompt_tokens + est_completion:
                 refund_tokens((prompt_tokens + est_completion) - real_spent)
             
             if content:
-                commit_msg = content.strip()
-                
                 # Remove markdown code block markers if present
-                if commit_msg.startswith("```") and commit_msg.endswith("```"):
-                    commit_msg = commit_msg[3:-3].strip()
-                elif commit_msg.startswith("```"):
-                    commit_msg = commit_msg[3:].strip()
-                elif commit_msg.endswith("```"):
-                    commit_msg = commit_msg[:-3].strip()
+                commit_msg = _FENCE_RE.sub("", content.strip()).strip()
                 
                 print("Successfully generated commit message!")
                 return commit_msg
@@ -307,13 +512,18 @@ def generate_commit_message_with_retry(
                 return generate_fallback_commit_message()
             
         except Exception as e:
-            # Check if it's a connection/timeout error
-            error_str = str(e).lower()
-            is_network_error = "connection" in error_str or "timeout" in error_str
+            # Check if it's a connection/timeout error (the hint is near the
+            # start; provider errors can carry long response bodies)
+            error_str = str(e)[:256].lower()
+            is_network_error = any(token in error_str for token in _NETWORK_ERROR_TOKENS)
             
             refund_tokens(prompt_tokens + est_completion)  # refund on failure
             error_type = "Network error" if is_network_error else "Error"
             print(f"{error_type} on attempt {attempt + 1}: {e}")
+            if is_network_error and not check_network_connectivity():
+                print("Warning: Cannot connect to API server. Network may be down.")
+                print("Using fallback commit message.")
+                return generate_fallback_commit_message()
             if attempt < max_retries - 1:
                 wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
                 print(f"Retrying in {wait_time} seconds...")
@@ -330,8 +540,13 @@ def smart_hierarchical_commit_message(
     full_diff: str,
     model: str = "gpt-4o-mini",
     temperature: float = 0.2,
+    use_cache: bool = True,
 ) -> str:
-    """Smart hierarchical approach that handles large repositories efficiently."""
+    """Smart hierarchical approach that handles large repositories efficiently.
+
+    `use_cache=False` asks the model again for file summaries cached by
+    earlier runs.
+    """
     try:
         chunks = split_diff_by_file(full_diff)
         print(f"Summarising {len(chunks)} file diffs…")
@@ -351,11 +566,11 @@ def smart_hierarchical_commit_message(
             
             # Use sampling strategy for large repositories
             return sampled_commit_message(
-                chunks, model, temperature, max_files_affordable
+                chunks, model, temperature, max_files_affordable, use_cache
             )
         
         # Original hierarchical approach for manageable repositories
-        return hierarchical_commit_message(full_diff, model, temperature)
+        return hierarchical_commit_message(full_diff, model, temperature, use_cache)
         
     except Exception as e:
         print(f"  → Warning: Smart hierarchical approach failed: {e}")
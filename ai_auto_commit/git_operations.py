@@ -2,9 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import functools
+import itertools
+import os
+import re
+import shutil
 import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import pygit2
+except ImportError:  # optional: in-process read-only queries via libgit2
+    pygit2 = None
 
 
 class GitPushError(Exception):
@@ -25,87 +41,777 @@ class GitPushError(Exception):
         self.recovery_action = recovery_action
 
 
+# Git directory of each repository root found by `_find_repo_root`
+_GIT_DIRS: Dict[str, Path] = {}
+
+
+@functools.lru_cache(maxsize=8)
+def _find_repo_root(cwd: str) -> Path:
+    """Ask git for the repository root (and git directory) containing `cwd`.
+
+    A single `rev-parse` answers both, and unlike looking for a `.git`
+    directory it also handles linked worktrees and submodules, where
+    `.git` is a file pointing elsewhere.
+    """
+    try:
+        result = subprocess.run(
+            [_git_executable(), "rev-parse", "--show-toplevel", "--absolute-git-dir"],
+            cwd=cwd,
+            check=True,
+            capture_output=True,
+            text=True,
+            close_fds=False,
+        )
+    except (subprocess.CalledProcessError, OSError):
+        raise RuntimeError(
+            f"Not in a git repository. Current directory: {cwd}\n"
+            "Please run this command from within a git repository."
+        ) from None
+    toplevel, git_dir = result.stdout.splitlines()[:2]
+    root = Path(toplevel)
+    _GIT_DIRS[str(root)] = Path(git_dir)
+    return root
+
+
 def get_target_directory() -> Path:
-    """Get the git repository root directory from the current working directory."""
-    # Start from the current working directory
-    current_dir = Path.cwd().resolve()
-    
-    # Walk up the directory tree to find the .git directory
-    for path in [current_dir] + list(current_dir.parents):
-        git_dir = path / ".git"
-        if git_dir.exists() and (git_dir.is_dir() or git_dir.is_file()):
-            return path
-    
-    # If we didn't find a git repository, raise an error
-    raise RuntimeError(
-        f"Not in a git repository. Current directory: {current_dir}\n"
-        "Please run this command from within a git repository."
+    """Get the git repository root directory from the current working directory.
+
+    The lookup is memoized per working directory, so repeated calls cost a
+    single `getcwd` instead of a `stat` walk up the tree.
+    """
+    return _find_repo_root(os.getcwd())
+
+
+def clear_cache() -> None:
+    """Forget memoized repository lookups (e.g. after moving or creating a repo)."""
+    _find_repo_root.cache_clear()
+    _GIT_DIRS.clear()
+
+
+def git_dir(target_dir: Path) -> Path:
+    """Return the git directory of the repository rooted at `target_dir`.
+
+    Uses the directory `rev-parse` reported when the root was looked up
+    (which differs from `<root>/.git` in linked worktrees), falling back to
+    `<root>/.git` for roots that didn't come from `get_target_directory`.
+    """
+    return _GIT_DIRS.get(str(target_dir)) or target_dir / ".git"
+
+
+# Repositories opened through pygit2, keyed by target directory
+_PYGIT2_REPOS: Dict[str, "pygit2.Repository"] = {}
+
+
+def _pygit2_repo(target_dir: Path) -> "pygit2.Repository":
+    """Open (once per directory) the pygit2 repository for `target_dir`."""
+    key = str(target_dir)
+    repo = _PYGIT2_REPOS.get(key)
+    if repo is None:
+        repo = _PYGIT2_REPOS[key] = pygit2.Repository(key)
+    return repo
+
+
+def _is_plain_path(path: str) -> bool:
+    """Return True if git would print `path` unquoted in every output format."""
+    return path.isascii() and path.isprintable() and not any(c in path for c in ' "\\')
+
+
+def _pygit2_staged_diff(repo: "pygit2.Repository", args: Tuple[str, ...]) -> Optional[str]:
+    """Render the supported `git diff --cached` variants from a libgit2 diff."""
+    if repo.head_is_unborn:
+        return None  # no HEAD tree to compare against
+    options = set(args[2:]) - {"--", "."}
+    raw_numstat = options == {"--raw", "--numstat", "--no-abbrev", "-z"}
+    if not raw_numstat and (
+        not options <= {"-U0", "--name-status", "--numstat"} or len(options) > 1
+    ):
+        return None
+    repo.index.read(False)  # pick up changes made by other git processes
+    diff = repo.index.diff_to_tree(
+        repo.head.peel(pygit2.Tree),
+        context_lines=0 if "-U0" in options else 3,
     )
+    diff.find_similar()  # rename detection, honouring diff.renames
+    deltas = list(diff.deltas)
+    for delta in deltas:
+        # libgit2 scores similarity differently from git, so renames/copies
+        # (and paths git would quote) are left to git itself
+        if delta.status_char() in "RC" or not _is_plain_path(delta.new_file.path):
+            return None
+
+    if "--name-status" in options:
+        return "".join(f"{d.status_char()}\t{d.new_file.path}\n" for d in deltas)
+
+    if "--numstat" in options:
+        terminator = "\0" if raw_numstat else "\n"
+        lines = []
+        if raw_numstat:
+            for delta in deltas:
+                lines.append(
+                    f":{delta.old_file.mode:06o} {delta.new_file.mode:06o} "
+                    f"{delta.old_file.id} {delta.new_file.id} "
+                    f"{delta.status_char()}\0{delta.new_file.path}\0"
+                )
+        for patch in diff:
+            path = patch.delta.new_file.path
+            if patch.delta.is_binary:
+                lines.append(f"-\t-\t{path}{terminator}")
+            else:
+                _, added, deleted = patch.line_stats
+                lines.append(f"{added}\t{deleted}\t{path}{terminator}")
+        return "".join(lines)
+
+    return diff.patch or ""
+
+
+def _pygit2_output(target_dir: Path, args: Tuple[str, ...]) -> Optional[str]:
+    """
+    Serve a read-only git query in-process through pygit2 when possible.
+
+    Only `rev-parse --abbrev-ref HEAD` and the `diff --cached` variants
+    used by this package (including the combined `--raw --numstat
+    --no-abbrev -z` form) are handled. Returns None when pygit2 is not
+    installed or the query can't be reproduced exactly, in which case the
+    caller falls back to running git.
+    """
+    if pygit2 is None:
+        return None
+    try:
+        repo = _pygit2_repo(target_dir)
+        if args == ("rev-parse", "--abbrev-ref", "HEAD"):
+            if repo.head_is_unborn:
+                return None
+            return ("HEAD" if repo.head_is_detached else repo.head.shorthand) + "\n"
+        if args[:2] == ("diff", "--cached"):
+            return _pygit2_staged_diff(repo, args)
+    except pygit2.GitError:
+        pass
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _git_executable() -> str:
+    """Absolute path of the git binary, resolved once per process."""
+    return shutil.which("git") or "git"
+
+
+def _git_cmd(target_dir: Path, args: Tuple[str, ...]) -> List[str]:
+    """Build a git command line for the target directory.
+
+    Git is invoked by absolute path and with ``close_fds=False`` (our own
+    descriptors are non-inheritable anyway), which lets CPython start it with
+    posix_spawn instead of fork+exec and so avoid duplicating the page tables
+    of a parent that already has the LLM client stack loaded.
+    """
+    return [_git_executable(), "-C", str(target_dir), *args]
 
 
 def run_git_command(target_dir: Path, *args: str) -> subprocess.CompletedProcess[str]:
     """Run a git command in the target directory."""
     return subprocess.run(
-        ["git", "-C", str(target_dir)] + list(args),
+        _git_cmd(target_dir, args),
         check=True,
         capture_output=True,
-        text=True
+        text=True,
+        close_fds=False,
     )
 
 
 def run_git_command_output(target_dir: Path, *args: str) -> str:
     """Run a git command in the target directory and return the output."""
+    output = _pygit2_output(target_dir, args)
+    if output is not None:
+        return output
     result = subprocess.run(
-        ["git", "-C", str(target_dir)] + list(args),
+        _git_cmd(target_dir, args),
         check=True,
         capture_output=True,
-        text=True
+        text=True,
+        close_fds=False,
     )
     return result.stdout
 
 
-def show_changes_summary(target_dir: Path) -> None:
-    """Show a summary of all changes in the repository."""
+def _try_git_output(target_dir: Path, *args: str) -> Optional[str]:
+    """Run a git command and return its output, or None if it failed.
+
+    For probes where failure is an expected answer (no upstream, not a
+    repository), so the common path doesn't build and unwind a
+    `CalledProcessError`.
+    """
+    result = subprocess.run(
+        _git_cmd(target_dir, args),
+        capture_output=True,
+        text=True,
+        close_fds=False,
+    )
+    return None if result.returncode else result.stdout
+
+
+def run_git_command_stream(target_dir: Path, *args: str) -> Iterator[str]:
+    """Run a git command in the target directory and yield its output lines.
+
+    Lines are consumed as git produces them instead of being buffered whole.
+    Raises `subprocess.CalledProcessError` once the output is exhausted if git
+    exited with a non-zero status.
+    """
+    output = _pygit2_output(target_dir, args)
+    if output is not None:
+        yield from output.splitlines(keepends=True)
+        return
+    cmd = _git_cmd(target_dir, args)
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        bufsize=1 << 16,
+        text=True,
+        close_fds=False,
+    ) as proc:
+        yield from proc.stdout
+        stderr = proc.stderr.read()
+        returncode = proc.wait()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd, None, stderr)
+
+
+def run_git_command_records(target_dir: Path, *args: str) -> Iterator[str]:
+    """Run a git command with NUL-delimited (`-z`) output and yield each record.
+
+    Records are read and decoded as git produces them, so memory stays
+    bounded by one read buffer however long the output is. Raises
+    `subprocess.CalledProcessError` once the output is exhausted if git
+    exited with a non-zero status.
+    """
+    cmd = _git_cmd(target_dir, args)
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        close_fds=False,
+    ) as proc:
+        pending = b""
+        for block in iter(lambda: proc.stdout.read1(1 << 16), b""):
+            *records, pending = (pending + block).split(b"\0")
+            for record in records:
+                yield os.fsdecode(record)
+        if pending:
+            yield os.fsdecode(pending)
+        stderr = proc.stderr.read().decode("utf-8", "replace")
+        returncode = proc.wait()
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd, None, stderr)
+
+
+async def arun_git_command(target_dir: Path, *args: str) -> subprocess.CompletedProcess[str]:
+    """Async twin of `run_git_command`, so git can run while other work proceeds.
+
+    Raises `subprocess.CalledProcessError` (carrying stdout/stderr) on a
+    non-zero exit, exactly like the synchronous version.
+    """
+    cmd = _git_cmd(target_dir, args)
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        close_fds=False,
+    )
+    stdout_b, stderr_b = await proc.communicate()
+    stdout = stdout_b.decode("utf-8", "replace")
+    stderr = stderr_b.decode("utf-8", "replace")
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+
+async def arun_git_command_output(target_dir: Path, *args: str) -> str:
+    """Async twin of `run_git_command_output` for overlapping read-only queries.
+
+    Raises `subprocess.CalledProcessError` (carrying stdout/stderr) on a
+    non-zero exit, exactly like the synchronous version.
+    """
+    output = _pygit2_output(target_dir, args)
+    if output is not None:
+        return output
+    return (await arun_git_command(target_dir, *args)).stdout
+
+
+async def _agather_git(target_dir: Path, cmds: Tuple[Tuple[str, ...], ...]) -> List[str]:
+    return list(await asyncio.gather(
+        *(arun_git_command_output(target_dir, *cmd) for cmd in cmds)
+    ))
+
+
+def parallel_git(target_dir: Path, *cmds: Tuple[str, ...]) -> List[str]:
+    """Run independent read-only git commands concurrently.
+
+    Returns each command's output in the order given. Only pass read-only
+    commands (ideally with `--no-optional-locks`), since they run at the
+    same time against the same repository. Raises
+    `subprocess.CalledProcessError` if any of them fails.
+    """
+    return asyncio.run(_agather_git(target_dir, cmds))
+
+
+def get_full_status(target_dir: Path) -> Tuple[str, str, str]:
+    """Return (porcelain v2 status, current branch, stash list) in one round.
+
+    The three queries are independent, so they overlap instead of each
+    waiting for the previous git process to finish.
+    """
+    status, branch, stash = parallel_git(
+        target_dir,
+        ("--no-optional-locks", "status", "--porcelain=v2", "--branch"),
+        ("rev-parse", "--abbrev-ref", "HEAD"),
+        ("--no-optional-locks", "stash", "list"),
+    )
+    return status, branch.strip(), stash
+
+
+class GitSession:
+    """A long-running `git cat-file --batch-check` process for one repository.
+
+    Revisions are written to git's stdin one per line and resolved from the
+    matching output line, so any number of lookups share a single git
+    startup instead of spawning `git rev-parse` for each.
+    """
+
+    def __init__(self, target_dir: Path):
+        self.target_dir = target_dir
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> subprocess.Popen:
+        return subprocess.Popen(
+            _git_cmd(self.target_dir, ("cat-file", "--batch-check")),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            close_fds=False,
+        )
+
+    def _query(self, revs: Tuple[str, ...]) -> List[str]:
+        if self._proc is None or self._proc.poll() is not None:
+            self._proc = self._start()
+        self._proc.stdin.write("".join(f"{rev}\n" for rev in revs))
+        self._proc.stdin.flush()
+        lines = [self._proc.stdout.readline() for _ in revs]
+        if not all(lines):
+            raise BrokenPipeError("git cat-file exited unexpectedly")
+        return lines
+
+    def resolve(self, *revs: str) -> List[Optional[str]]:
+        """Return the object name for each revision, or None if it doesn't exist."""
+        with self._lock:
+            try:
+                lines = self._query(revs)
+            except (BrokenPipeError, OSError):
+                # The process went away between calls; start over once
+                self.close()
+                lines = self._query(revs)
+        resolved: List[Optional[str]] = []
+        for line in lines:
+            # "<sha> <type> <size>" on success, "<rev> missing" (or
+            # "<rev> ambiguous") otherwise
+            parts = line.split()
+            resolved.append(
+                parts[0] if len(parts) == 3 and parts[2].isdigit() else None
+            )
+        return resolved
+
+    def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is not None:
+            proc.stdin.close()
+            proc.stdout.close()
+            proc.wait()
+
+    def __enter__(self) -> "GitSession":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_git_sessions: Dict[str, GitSession] = {}
+_git_sessions_lock = threading.Lock()
+
+
+def _close_git_sessions() -> None:
+    for session in list(_git_sessions.values()):
+        session.close()
+
+
+def git_session(target_dir: Path) -> GitSession:
+    """Return the shared `GitSession` for `target_dir`, closed at exit."""
+    key = str(target_dir)
+    with _git_sessions_lock:
+        session = _git_sessions.get(key)
+        if session is None:
+            if not _git_sessions:
+                atexit.register(_close_git_sessions)
+            session = _git_sessions[key] = GitSession(target_dir)
+    return session
+
+
+# `git status --short` results reused for this many seconds
+_STATUS_TTL = 5.0
+_status_cache: Dict[Path, Tuple[Tuple[int, int], float, str]] = {}
+
+
+def _status_key(target_dir: Path) -> Tuple[int, int]:
+    """Change stamp of the index and HEAD (0 when a file doesn't exist yet)."""
+    stamps = []
+    for name in ("index", "HEAD"):
+        try:
+            stamps.append((git_dir(target_dir) / name).stat().st_mtime_ns)
+        except OSError:
+            stamps.append(0)
+    return stamps[0], stamps[1]
+
+
+def status_short(target_dir: Path) -> str:
+    """Return `git status --short`, reusing a result from the last few seconds.
+
+    A cached result is only reused while the index and HEAD are unchanged, so
+    staging, committing or switching branches always shows fresh output. The
+    cache is per process: working-tree edits don't touch either file, so the
+    short TTL is what bounds how stale an unstaged change can be.
+    """
+    key = _status_key(target_dir)
+    now = time.monotonic()
+    cached = _status_cache.get(target_dir)
+    if cached is not None and cached[0] == key and now - cached[1] < _STATUS_TTL:
+        return cached[2]
+    output = run_git_command_output(target_dir, "status", "--short")
+    # Stamped after the call: status itself may refresh (rewrite) the index
+    _status_cache[target_dir] = (_status_key(target_dir), now, output)
+    return output
+
+
+def show_changes_summary(target_dir: Path, status_output: Optional[str] = None) -> None:
+    """Show a summary of all changes in the repository.
+
+    `status_output` may carry an already collected `git status` output so the
+    summary does not need to shell out again.
+    """
     print("Repository changes summary:")
     print("=" * 50)
     
     # Show detailed status
-    result = run_git_command_output(target_dir, "status")
+    result = status_output
+    if result is None:
+        result = run_git_command_output(target_dir, "--no-optional-locks", "status")
     print(result)
     print("=" * 50)
 
 
-def has_changes(target_dir: Path) -> bool:
-    """Check if there are any changes in the repository."""
+@dataclass
+class RepoState:
+    """Branch, upstream and change entries from one `git status` call."""
+    branch: Optional[str]
+    upstream: Optional[str]
+    ahead: int
+    behind: int
+    entries: List[str] = field(default_factory=list)
+
+
+def get_repo_state(target_dir: Path, untracked: bool = True) -> RepoState:
+    """Collect branch, ahead/behind and changed entries in a single git call.
+
+    Uses `git status --porcelain=v2 --branch -z`, whose `# branch.*` header
+    lines carry what would otherwise take `rev-parse` and `rev-list` calls.
+    `branch` is None on a detached HEAD, `upstream` is None when no
+    tracking branch is configured (ahead/behind are then 0). With
+    `untracked=False` git skips the untracked-file walk of the worktree,
+    which dominates status time in large repositories.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        If git fails (e.g. not a repository).
+    """
+    # Records are parsed as git produces them, so the raw output is never
+    # held alongside the parsed entries
+    return _parse_repo_state(
+        run_git_command_records(target_dir, *_repo_state_args(untracked))
+    )
+
+
+def _repo_state_args(untracked: bool) -> Tuple[str, ...]:
+    return (
+        "--no-optional-locks", "status",
+        "--porcelain=v2", "--branch", "-z",
+        "--untracked-files=" + ("normal" if untracked else "no"),
+    )
+
+
+def _parse_repo_state(records: Iterable[str]) -> RepoState:
+    """Build a `RepoState` from `status --porcelain=v2 --branch -z` records."""
+    state = RepoState(branch=None, upstream=None, ahead=0, behind=0)
+    records = iter(records)
+    for record in records:
+        if record.startswith("# branch.head "):
+            head = record[len("# branch.head "):]
+            state.branch = None if head == "(detached)" else head
+        elif record.startswith("# branch.upstream "):
+            state.upstream = record[len("# branch.upstream "):]
+        elif record.startswith("# branch.ab "):
+            ahead, behind = record[len("# branch.ab "):].split()
+            state.ahead, state.behind = int(ahead), -int(behind)
+        elif record and not record.startswith("#"):
+            state.entries.append(record)
+            if record.startswith("2 "):
+                next(records, None)  # a rename's original path follows
+    return state
+
+
+def has_changes(
+    target_dir: Path,
+    state: Optional[RepoState] = None,
+    include_untracked: bool = True,
+) -> bool:
+    """Check if there are any changes in the repository.
+
+    Pass a `RepoState` already collected by `get_repo_state` to avoid
+    running git again. `include_untracked=False` only looks at tracked
+    files: new files go unnoticed, but git no longer walks the whole
+    worktree, so the check stays fast on large repositories.
+    """
+    if state is not None:
+        return bool(state.entries)
+    # Stops reading at the first entry; git is then stopped by the closed pipe
+    records = run_git_command_records(target_dir, *_repo_state_args(include_untracked))
     try:
-        result = run_git_command_output(target_dir, "status", "--porcelain")
-        return bool(result.strip())
+        return any(record and not record.startswith("#") for record in records)
     except subprocess.CalledProcessError:
         return False
+    finally:
+        records.close()
+
+
+def has_untracked_files(target_dir: Path) -> bool:
+    """Check for untracked (and not ignored) files, stopping at the first one."""
+    lines = run_git_command_stream(
+        target_dir, "--no-optional-locks", "ls-files", "--others",
+        "--exclude-standard", "--directory", "--no-empty-directory",
+    )
+    try:
+        return next(lines, None) is not None
+    except subprocess.CalledProcessError:
+        return False
+    finally:
+        lines.close()
+
+
+# Parsed packed-refs per common git directory, with the mtime it was read at
+_packed_refs_cache: Dict[str, Tuple[int, Dict[str, str]]] = {}
+
+
+def _common_dir(target_dir: Path) -> Path:
+    """Directory holding the shared refs (differs from git_dir in worktrees)."""
+    repo_git_dir = git_dir(target_dir)
+    try:
+        common = (repo_git_dir / "commondir").read_text(encoding="utf-8").strip()
+    except OSError:
+        return repo_git_dir
+    return repo_git_dir / common
+
+
+def _packed_refs(common_dir: Path) -> Dict[str, str]:
+    """Map ref name to object name from `packed-refs`, re-read when it changes."""
+    path = common_dir / "packed-refs"
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return {}
+    cached = _packed_refs_cache.get(str(common_dir))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    refs: Dict[str, str] = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                # Skip the header and peeled-tag ("^<sha>") lines
+                if line[:1] not in ("#", "^"):
+                    sha, _, name = line.rstrip("\n").partition(" ")
+                    refs[name] = sha
+    except (OSError, UnicodeDecodeError):
+        return {}
+    _packed_refs_cache[str(common_dir)] = (mtime, refs)
+    return refs
+
+
+def _read_ref(target_dir: Path, ref: str, follow: bool = True) -> Optional[str]:
+    """Resolve `ref` ("HEAD" or "refs/...") by reading the ref files directly.
+
+    Follows one symbolic ref and falls back to packed-refs for refs without
+    a loose file. Returns None whenever the answer isn't certain (unusual
+    ref storage, unreadable files), so callers can fall back to git.
+    """
+    if ref == "HEAD":
+        path = git_dir(target_dir) / "HEAD"
+    else:
+        path = _common_dir(target_dir) / ref
+    try:
+        content = path.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        if ref == "HEAD":
+            return None
+        return _packed_refs(_common_dir(target_dir)).get(ref)
+    except (OSError, UnicodeDecodeError):
+        return None
+    if content.startswith("ref: "):
+        return _read_ref(target_dir, content[len("ref: "):], follow=False) if follow else None
+    if len(content) in (40, 64) and all(c in "0123456789abcdef" for c in content):
+        return content
+    return None
+
+
+# Current branch per repository, with the HEAD mtime it was read at
+_branch_cache: Dict[str, Tuple[int, str]] = {}
 
 
-def has_unpushed_commits(target_dir: Path, remote: str = "origin") -> bool:
-    """Check if there are any unpushed commits in the repository."""
+def current_branch(target_dir: Path) -> str:
+    """Return the checked-out branch name, or "HEAD" when detached.
+
+    Read straight from the git directory's HEAD file when it's a symbolic
+    ref (the common case), falling back to `git rev-parse` otherwise. The
+    answer is cached until HEAD's mtime changes, so repeat calls cost one
+    `stat`.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        If the fallback `git rev-parse` fails (e.g. unborn branch).
+    """
+    key = str(target_dir)
+    head_file = git_dir(target_dir) / "HEAD"
     try:
-        # Get current branch
-        current_branch = run_git_command_output(
+        mtime = head_file.stat().st_mtime_ns
+    except OSError:
+        mtime = None
+    cached = _branch_cache.get(key)
+    if mtime is not None and cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    branch = None
+    if mtime is not None:
+        try:
+            head = head_file.read_text(encoding="utf-8").strip()
+        except (OSError, UnicodeDecodeError):
+            head = ""
+        if head.startswith("ref: refs/heads/"):
+            branch = head[len("ref: refs/heads/"):]
+    if branch is None:
+        branch = run_git_command_output(
             target_dir, "rev-parse", "--abbrev-ref", "HEAD"
         ).strip()
-        
+    if mtime is not None:
+        _branch_cache[key] = (mtime, branch)
+    return branch
+
+
+def has_unpushed_commits(
+    target_dir: Path, remote: str = "origin", state: Optional[RepoState] = None
+) -> bool:
+    """Check if there are any unpushed commits in the repository.
+
+    When a `RepoState` is given and its upstream is `<remote>/<branch>`, its
+    ahead count answers directly without running git.
+    """
+    if (
+        state is not None
+        and state.branch is not None
+        and state.upstream == f"{remote}/{state.branch}"
+    ):
+        return state.ahead > 0
+    try:
+        branch = current_branch(target_dir)
+
+        # Matching tips read straight from the ref files settle the usual
+        # up-to-date case without starting git at all
+        head = _read_ref(target_dir, "HEAD")
+        if head is not None and head == _read_ref(target_dir, f"refs/remotes/{remote}/{branch}"):
+            return False
+
+        # Both tips come from the shared cat-file session; an up-to-date
+        # branch (the usual case) needs no rev-list walk at all
+        head, upstream = git_session(target_dir).resolve(
+            "HEAD", f"{remote}/{branch}"
+        )
+        if head is None or upstream is None or head == upstream:
+            return False
+
         # Check if local branch is ahead of remote
-        ahead_count = run_git_command_output(
-            target_dir, "rev-list", "--count", f"{remote}/{current_branch}..HEAD"
-        ).strip()
-        
-        return ahead_count != "0"
+        ahead_count = _try_git_output(
+            target_dir, "rev-list", "--count", f"{remote}/{branch}..HEAD"
+        )
+        return ahead_count is not None and ahead_count.strip() != "0"
         
-    except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, OSError):
         # If there's an error (e.g., no remote tracking branch), assume no unpushed commits
         return False
 
 
-def clear_git_cache(target_dir: Path) -> None:
-    """Clear the git staging area and untrack files that are now in .gitignore."""
+# Untracked paths listed per stdout write
+_LIST_BATCH_SIZE = 1000
+
+
+def _untrack_paths(target_dir: Path, paths: Iterator[str], quiet: bool = False) -> int:
+    """Remove `paths` from the index, keeping the files, and return how many.
+
+    Paths are streamed NUL-delimited into a single `git update-index
+    --force-remove -z --stdin`, so however many there are the index is
+    rewritten once by one process. Unless `quiet`, each path is listed,
+    one stdout write per batch. Nothing is started when `paths` is empty.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        If update-index fails (e.g. the index is locked).
+    """
+    cmd = _git_cmd(target_dir, ("update-index", "--force-remove", "-z", "--stdin"))
+    proc: Optional[subprocess.Popen] = None
+    count = 0
+    listed: List[str] = []
+    try:
+        for file_path in paths:
+            if proc is None:
+                proc = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    close_fds=False,
+                )
+            proc.stdin.write(os.fsencode(file_path) + b"\0")
+            count += 1
+            if not quiet:
+                listed.append(f"    → {file_path}\n")
+                if len(listed) >= _LIST_BATCH_SIZE:
+                    sys.stdout.write("".join(listed))
+                    listed = []
+    finally:
+        if listed:
+            sys.stdout.write("".join(listed))
+        sys.stdout.flush()
+        if proc is not None:
+            proc.stdin.close()
+            stderr = proc.stderr.read().decode("utf-8", "replace")
+            proc.stderr.close()
+            if proc.wait():
+                raise subprocess.CalledProcessError(proc.returncode, cmd, None, stderr)
+    return count
+
+
+def clear_git_cache(target_dir: Path, quiet: bool = False) -> None:
+    """Clear the git staging area and untrack files that are now in .gitignore.
+
+    With `quiet=True` the untracked paths aren't listed one by one; the
+    summary lines are still printed.
+    """
     print("Clearing git staging area and untracking ignored files...")
     
     try:
@@ -117,38 +823,30 @@ def clear_git_cache(target_dir: Path) -> None:
         # Remove files from git index that are now in .gitignore (but keep them locally)
         # This will untrack files that were previously tracked but are now ignored
         try:
-            # Get list of files that are tracked but would be ignored
-            result = run_git_command_output(
-                target_dir, "ls-files", "--ignored", "--exclude-standard"
+            # Tracked files that would be ignored, streamed NUL-delimited (so
+            # paths come back verbatim) straight into update-index. No
+            # per-file existence check: removing from the index never
+            # touches the working tree, and a path that's already gone
+            # locally is just as safe to drop.
+            ignored = run_git_command_records(
+                target_dir, "ls-files", "-z", "--cached", "--ignored", "--exclude-standard"
             )
-            ignored_tracked_files = result.strip().split('\n') if result.strip() else []
-            
-            if ignored_tracked_files:
-                print(
-                    f"  → Found {len(ignored_tracked_files)} tracked files "
-                    "that are now in .gitignore"
-                )
-                print("  → These files will be untracked but kept locally:")
-                
-                for file_path in ignored_tracked_files:
-                    if file_path:  # Skip empty lines
-                        # Verify the file exists locally before untracking
-                        local_file_path = target_dir / file_path
-                        if local_file_path.exists():
-                            try:
-                                run_git_command(target_dir, "rm", "--cached", file_path)
-                                print(f"    → Untracked (kept locally): {file_path}")
-                            except subprocess.CalledProcessError:
-                                # File might have been removed already or doesn't exist
-                                print(f"    → Warning: Could not untrack {file_path}")
-                        else:
-                            print(
-                                f"    → Warning: File {file_path} not found locally, skipping"
-                            )
-                
-                print("  → Successfully untracked files that are now in .gitignore")
-            else:
+            first = next(ignored, None)
+            if first is None:
                 print("  → No tracked files to untrack")
+            else:
+                print("  → These files will be untracked but kept locally:")
+                try:
+                    count = _untrack_paths(
+                        target_dir, itertools.chain((first,), ignored), quiet
+                    )
+                    print(
+                        f"  → Successfully untracked {count} files that are now in .gitignore"
+                    )
+                except subprocess.CalledProcessError as e:
+                    if "update-index" not in e.cmd:
+                        raise  # the listing itself failed
+                    print(f"  → Warning: Could not untrack files: {_fmt_git_error(e)}")
                 
         except subprocess.CalledProcessError:
             # If ls-files fails, it might be because there are no files to check
@@ -159,6 +857,113 @@ def clear_git_cache(target_dir: Path) -> None:
         # Continue anyway, as this is not critical
 
 
+# Push failure categories in priority order, each with the (lowercase)
+# phrases in git's output that identify it
+_PUSH_FAILURE_PHRASES = (
+    ("non_fast_forward", ("non-fast-forward", "fetch first")),
+    ("no_upstream", ("no upstream branch", "set-upstream")),
+    ("auth", (
+        "authentication", "permission denied", "could not read from remote",
+        "fatal: could not read username",
+    )),
+    ("protected", ("protected branch",)),
+    ("not_found", ("repository not found",)),
+    ("rejected", ("remote rejected", "pre-receive hook declined")),
+    ("network", ("connection refused", "network", "timeout", "could not resolve host")),
+)
+_PUSH_FAILURE_PRIORITY = {name: rank for rank, (name, _) in enumerate(_PUSH_FAILURE_PHRASES)}
+# One alternation over every phrase, so the output is scanned once rather
+# than once per phrase; the named group that matched is the category
+_PUSH_FAILURE_RE = re.compile("|".join(
+    f"(?P<{name}>{'|'.join(map(re.escape, phrases))})"
+    for name, phrases in _PUSH_FAILURE_PHRASES
+))
+
+
+def _classify_push_failure(output: str) -> Optional[str]:
+    """Return the highest-priority failure category found in `output`."""
+    found = {match.lastgroup for match in _PUSH_FAILURE_RE.finditer(output)}
+    return min(found, key=_PUSH_FAILURE_PRIORITY.__getitem__, default=None)
+
+
+# Diagnosis for each push failure category; only `{remote}` and `{branch}`
+# in the message and suggestion vary between calls
+_PUSH_ERROR_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    # Non-fast-forward (remote has commits we don't have)
+    "non_fast_forward": dict(
+        message="Push rejected: remote '{remote}/{branch}' has commits that are not in your local branch.",
+        cause="The remote branch has new commits that you don't have locally. This typically happens when someone else pushed changes, or you pushed from another machine.",
+        suggestion="You can either:\n"
+                   "  1. Rebase your changes on top of the remote (recommended for clean history)\n"
+                   "  2. Merge the remote changes into your local branch\n"
+                   "  3. Force push (WARNING: this will overwrite remote changes!)",
+        recoverable=True,
+        recovery_action="pull_rebase",
+    ),
+    # No upstream branch set
+    "no_upstream": dict(
+        message="Push failed: no upstream branch configured for '{branch}'.",
+        cause="Your local branch doesn't have a tracking relationship with a remote branch.",
+        suggestion="Run: git push --set-upstream {remote} {branch}",
+        recoverable=True,
+        recovery_action="set_upstream",
+    ),
+    # Authentication failure
+    "auth": dict(
+        message="Push failed: authentication error.",
+        cause="Git couldn't authenticate with the remote repository. This could be due to invalid credentials, expired tokens, or missing SSH keys.",
+        suggestion="Try the following:\n"
+                   "  1. Check your credentials: git config --global credential.helper\n"
+                   "  2. For HTTPS: ensure your personal access token is valid\n"
+                   "  3. For SSH: ensure your SSH key is added (ssh-add -l)\n"
+                   "  4. Try: git remote -v to verify the remote URL",
+        recoverable=False,
+        recovery_action=None,
+    ),
+    # Protected branch
+    "protected": dict(
+        message="Push failed: '{branch}' is a protected branch.",
+        cause="The branch has protection rules that prevent direct pushes.",
+        suggestion="You need to:\n"
+                   "  1. Create a pull/merge request instead of pushing directly\n"
+                   "  2. Or ask an admin to temporarily disable branch protection",
+        recoverable=False,
+        recovery_action=None,
+    ),
+    # Repository not found
+    "not_found": dict(
+        message="Push failed: remote repository '{remote}' not found.",
+        cause="The remote repository doesn't exist or you don't have access to it.",
+        suggestion="Check:\n"
+                   "  1. Verify remote URL: git remote get-url {remote}\n"
+                   "  2. Ensure the repository exists on the remote\n"
+                   "  3. Verify you have access to the repository",
+        recoverable=False,
+        recovery_action=None,
+    ),
+    # Remote rejected (generic)
+    "rejected": dict(
+        message="Push rejected by remote server.",
+        cause="The remote server rejected the push. This could be due to pre-receive hooks, CI checks, or policy violations.",
+        suggestion="Check the error message above for specific requirements.\n"
+                   "Common causes: commit message format, file size limits, or CI validation.",
+        recoverable=False,
+        recovery_action=None,
+    ),
+    # Network/connection issues
+    "network": dict(
+        message="Push failed: network error.",
+        cause="Could not connect to the remote server.",
+        suggestion="Check:\n"
+                   "  1. Your internet connection\n"
+                   "  2. VPN if required for your repository\n"
+                   "  3. Remote server status",
+        recoverable=True,
+        recovery_action="retry",
+    ),
+}
+
+
 def diagnose_push_failure(
     target_dir: Path,
     remote: str,
@@ -187,88 +992,15 @@ def diagnose_push_failure(
     GitPushError
         A descriptive error with cause, suggestion, and recovery options.
     """
-    combined_output = f"{stdout}\n{stderr}".lower()
-    
-    # Non-fast-forward (remote has commits we don't have)
-    if "non-fast-forward" in combined_output or "fetch first" in combined_output:
-        return GitPushError(
-            message=f"Push rejected: remote '{remote}/{branch}' has commits that are not in your local branch.",
-            cause="The remote branch has new commits that you don't have locally. This typically happens when someone else pushed changes, or you pushed from another machine.",
-            suggestion="You can either:\n"
-                       "  1. Rebase your changes on top of the remote (recommended for clean history)\n"
-                       "  2. Merge the remote changes into your local branch\n"
-                       "  3. Force push (WARNING: this will overwrite remote changes!)",
-            recoverable=True,
-            recovery_action="pull_rebase",
-        )
-    
-    # No upstream branch set
-    if "no upstream branch" in combined_output or "set-upstream" in combined_output:
-        return GitPushError(
-            message=f"Push failed: no upstream branch configured for '{branch}'.",
-            cause="Your local branch doesn't have a tracking relationship with a remote branch.",
-            suggestion=f"Run: git push --set-upstream {remote} {branch}",
-            recoverable=True,
-            recovery_action="set_upstream",
-        )
-    
-    # Authentication failure
-    if any(x in combined_output for x in ["authentication", "permission denied", "could not read from remote", "fatal: could not read username"]):
-        return GitPushError(
-            message="Push failed: authentication error.",
-            cause="Git couldn't authenticate with the remote repository. This could be due to invalid credentials, expired tokens, or missing SSH keys.",
-            suggestion="Try the following:\n"
-                       "  1. Check your credentials: git config --global credential.helper\n"
-                       "  2. For HTTPS: ensure your personal access token is valid\n"
-                       "  3. For SSH: ensure your SSH key is added (ssh-add -l)\n"
-                       "  4. Try: git remote -v to verify the remote URL",
-            recoverable=False,
-        )
-    
-    # Protected branch
-    if "protected branch" in combined_output:
-        return GitPushError(
-            message=f"Push failed: '{branch}' is a protected branch.",
-            cause="The branch has protection rules that prevent direct pushes.",
-            suggestion="You need to:\n"
-                       "  1. Create a pull/merge request instead of pushing directly\n"
-                       "  2. Or ask an admin to temporarily disable branch protection",
-            recoverable=False,
-        )
-    
-    # Repository not found
-    if "repository not found" in combined_output:
-        return GitPushError(
-            message=f"Push failed: remote repository '{remote}' not found.",
-            cause="The remote repository doesn't exist or you don't have access to it.",
-            suggestion="Check:\n"
-                       f"  1. Verify remote URL: git remote get-url {remote}\n"
-                       "  2. Ensure the repository exists on the remote\n"
-                       "  3. Verify you have access to the repository",
-            recoverable=False,
-        )
-    
-    # Remote rejected (generic)
-    if "remote rejected" in combined_output or "pre-receive hook declined" in combined_output:
+    category = _classify_push_failure(f"{stdout}\n{stderr}".lower())
+    template = _PUSH_ERROR_TEMPLATES.get(category)
+    if template is not None:
         return GitPushError(
-            message="Push rejected by remote server.",
-            cause="The remote server rejected the push. This could be due to pre-receive hooks, CI checks, or policy violations.",
-            suggestion="Check the error message above for specific requirements.\n"
-                       "Common causes: commit message format, file size limits, or CI validation.",
-            recoverable=False,
-        )
-    
-    # Network/connection issues
-    if any(x in combined_output for x in ["connection refused", "network", "timeout", "could not resolve host"]):
-        return GitPushError(
-            message="Push failed: network error.",
-            cause="Could not connect to the remote server.",
-            suggestion="Check:\n"
-                       "  1. Your internet connection\n"
-                       "  2. VPN if required for your repository\n"
-                       "  3. Remote server status",
-            recoverable=True,
-            recovery_action="retry",
+            message=template["message"].format(remote=remote, branch=branch),
+            cause=template["cause"],
+            suggestion=template["suggestion"].format(remote=remote, branch=branch),
+            recoverable=template["recoverable"],
+            recovery_action=template["recovery_action"],
         )
     
     # Generic fallback
@@ -283,6 +1015,11 @@ def diagnose_push_failure(
     )
 
 
+def _fmt_git_error(e: subprocess.CalledProcessError) -> str:
+    """The most useful text of a failed git command: stderr, then stdout."""
+    return (e.stderr or e.stdout or str(e)).strip()
+
+
 def attempt_push_recovery(
     target_dir: Path,
     remote: str,
@@ -326,11 +1063,11 @@ def attempt_push_recovery(
                 return False, "Recovery cancelled by user."
         
         try:
-            print(f"\n  → Fetching from {remote}...")
-            run_git_command(target_dir, "fetch", remote)
-            
-            print(f"  → Rebasing onto {remote}/{branch}...")
-            run_git_command(target_dir, "rebase", f"{remote}/{branch}")
+            # `pull --rebase` fetches just this branch and rebases onto it
+            # in one invocation; the push stays separate so a failure is
+            # still attributed to the right step
+            print(f"\n  → Fetching {remote}/{branch} and rebasing onto it...")
+            run_git_command(target_dir, "pull", "--rebase", remote, branch)
             
             print(f"  → Pushing to {remote}/{branch}...")
             run_git_command(target_dir, "push", remote, branch)
@@ -339,8 +1076,8 @@ def attempt_push_recovery(
             
         except subprocess.CalledProcessError as e:
             # Check if rebase failed due to conflicts
-            rebase_in_progress = (target_dir / ".git" / "rebase-merge").exists() or \
-                                 (target_dir / ".git" / "rebase-apply").exists()
+            rebase_in_progress = (git_dir(target_dir) / "rebase-merge").exists() or \
+                                 (git_dir(target_dir) / "rebase-apply").exists()
             
             if rebase_in_progress:
                 return False, (
@@ -354,7 +1091,7 @@ def attempt_push_recovery(
                     "  git rebase --abort"
                 )
             
-            return False, f"Recovery failed: {e.stderr if hasattr(e, 'stderr') else str(e)}"
+            return False, f"Recovery failed: {_fmt_git_error(e)}"
     
     elif recovery_action == "set_upstream":
         if not auto_recover:
@@ -372,7 +1109,7 @@ def attempt_push_recovery(
             return True, f"Successfully pushed and set upstream to {remote}/{branch}!"
             
         except subprocess.CalledProcessError as e:
-            return False, f"Recovery failed: {e.stderr if hasattr(e, 'stderr') else str(e)}"
+            return False, f"Recovery failed: {_fmt_git_error(e)}"
     
     elif recovery_action == "retry":
         if not auto_recover:
@@ -390,7 +1127,7 @@ def attempt_push_recovery(
             return True, "Push succeeded on retry!"
             
         except subprocess.CalledProcessError as e:
-            return False, f"Retry failed: {e.stderr if hasattr(e, 'stderr') else str(e)}"
+            return False, f"Retry failed: {_fmt_git_error(e)}"
     
     return False, f"Unknown recovery action: {recovery_action}"
 
@@ -401,6 +1138,8 @@ def push_with_recovery(
     branch: str,
     auto_recover: bool = False,
     max_retries: int = 1,
+    initial_error: Optional[subprocess.CalledProcessError] = None,
+    skip_if_clean: bool = True,
 ) -> str:
     """
     Push to remote with automatic failure diagnosis and optional recovery.
@@ -417,6 +1156,15 @@ def push_with_recovery(
         If True, automatically attempt recovery for recoverable errors.
     max_retries : int
         Maximum number of recovery attempts.
+    initial_error : subprocess.CalledProcessError, optional
+        Failure of a push the caller already ran (e.g. in the background).
+        When given, the first attempt is diagnosed from it instead of
+        pushing again.
+    skip_if_clean : bool
+        If True, return without running `git push` (and so without
+        contacting the remote) when the local branch and its
+        remote-tracking ref already point at the same commit. Pass False
+        when the push is wanted for its side effects (e.g. server hooks).
     
     Returns
     -------
@@ -428,13 +1176,23 @@ def push_with_recovery(
     GitPushError
         If push fails and recovery is not possible or was declined.
     """
+    if skip_if_clean and initial_error is None:
+        # Read from the ref files, so this costs no subprocess either; a
+        # branch without a remote-tracking ref is always pushed
+        local = _read_ref(target_dir, f"refs/heads/{branch}")
+        if local is not None and local == _read_ref(target_dir, f"refs/remotes/{remote}/{branch}"):
+            return f"Nothing to push to {remote}/{branch}"
+
     for attempt in range(max_retries + 1):
         try:
+            if attempt == 0 and initial_error is not None:
+                raise initial_error
             result = subprocess.run(
-                ["git", "-C", str(target_dir), "push", remote, branch],
+                _git_cmd(target_dir, ("push", remote, branch)),
                 check=True,
                 capture_output=True,
                 text=True,
+                close_fds=False,
             )
             return f"Successfully pushed to {remote}/{branch}"
             
@@ -2,43 +2,141 @@
 
 from __future__ import annotations
 
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
-# Import git_operations - handle both package and direct script execution
-try:
-    from .git_operations import run_git_command, run_git_command_output
-except ImportError:
-    from git_operations import run_git_command, run_git_command_output
+from .git_operations import get_repo_state, git_dir
 
 
-def check_dangerous_git_state(target_dir: Path) -> bool:
+@dataclass
+class _SafetyState:
+    """Everything the safety checks need, gathered with one `git status`."""
+    operation: Optional[str]  # "merge" or "rebase" when one is in progress
+    detached: bool
+    changes: List[Tuple[str, str]]  # (XY status, path) per changed entry
+
+
+def _entry_status(entry: str) -> Tuple[str, str]:
+    """Split a porcelain v2 entry into its two-letter status and path."""
+    if entry.startswith("? "):
+        return "??", entry[2:]
+    # Ordinary ("1"), renamed ("2") and unmerged ("u") entries have 8, 9
+    # and 10 space-separated fields before the path respectively
+    fields = {"1": 8, "2": 9, "u": 10}.get(entry[:1], 8)
+    parts = entry.split(" ", fields)
+    # v2 marks an unchanged side with "." where v1 printed a space
+    return parts[1].replace(".", " "), parts[-1]
+
+
+def _in_progress_operation(target_dir: Path) -> Optional[str]:
+    """Detect a merge or rebase from one listing of the git directory."""
+    try:
+        with os.scandir(git_dir(target_dir)) as entries:
+            names = {entry.name for entry in entries}
+    except OSError:
+        return None
+    if "MERGE_HEAD" in names:
+        return "merge"
+    if "rebase-apply" in names or "rebase-merge" in names:
+        return "rebase"
+    return None
+
+
+# Collected safety state reused for this many seconds while unchanged
+_SAFETY_TTL = 5.0
+_safety_cache: Dict[str, Tuple[Tuple[int, ...], float, _SafetyState]] = {}
+
+
+def _safety_key(target_dir: Path) -> Tuple[int, ...]:
+    """Change stamp of the git directory itself, its index and HEAD.
+
+    The directory's own mtime moves whenever MERGE_HEAD or a rebase
+    directory appears or disappears.
+    """
+    repo_git_dir = git_dir(target_dir)
+    stamps = []
+    for path in (repo_git_dir, repo_git_dir / "index", repo_git_dir / "HEAD"):
+        try:
+            stamps.append(path.stat().st_mtime_ns)
+        except OSError:
+            stamps.append(0)
+    return tuple(stamps)
+
+
+def _collect_git_state(target_dir: Path) -> _SafetyState:
+    """Gather merge/rebase, detached HEAD and change state for the checks.
+
+    A result from the last few seconds is reused while the git directory,
+    index and HEAD are unchanged, like `status_short`.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        If `git status` fails (e.g. not a git repository).
+    """
+    now = time.monotonic()
+    cached = _safety_cache.get(str(target_dir))
+    if (
+        cached is not None
+        and cached[0] == _safety_key(target_dir)
+        and now - cached[1] < _SAFETY_TTL
+    ):
+        return cached[2]
+    repo_state = get_repo_state(target_dir)
+    state = _SafetyState(
+        operation=_in_progress_operation(target_dir),
+        # An unborn branch (new repo with no commits) still has a name
+        detached=repo_state.branch is None,
+        changes=[_entry_status(entry) for entry in repo_state.entries],
+    )
+    # Stamped after the call: status itself may refresh (rewrite) the index
+    _safety_cache[str(target_dir)] = (_safety_key(target_dir), now, state)
+    return state
+
+
+def _render_status(changes: Iterable[Tuple[str, str]]) -> str:
+    return "".join(f"{status} {path}\n" for status, path in changes)
+
+
+def snapshot_status(target_dir: Path) -> str:
+    """Working tree changes as `git status --porcelain` style "XY path" lines.
+
+    Rendered from the state the safety check collected, so right after
+    `verify_working_directory_safety` this runs no git command. Paths are
+    never quoted, and a rename lists only its new path.
+    """
+    return _render_status(_collect_git_state(target_dir).changes)
+
+
+def check_dangerous_git_state(target_dir: Path, state: Optional[_SafetyState] = None) -> bool:
     """Check if git is in a dangerous state that could cause data loss."""
-    import subprocess
+    if state is None:
+        try:
+            state = _collect_git_state(target_dir)
+        except subprocess.CalledProcessError:
+            state = _SafetyState(
+                operation=_in_progress_operation(target_dir), detached=False, changes=[]
+            )
 
     # Check if we're in a merge or rebase state
-    merge_head = target_dir / ".git" / "MERGE_HEAD"
-    rebase_apply = target_dir / ".git" / "rebase-apply"
-    rebase_merge = target_dir / ".git" / "rebase-merge"
-
-    if merge_head.exists():
+    if state.operation == "merge":
         print("  → Warning: Repository is in merge state")
         return True
-    if rebase_apply.exists() or rebase_merge.exists():
+    if state.operation == "rebase":
         print("  → Warning: Repository is in rebase state")
         return True
 
     # Check if we're in detached HEAD state
-    try:
-        head_ref = run_git_command_output(
-            target_dir, "rev-parse", "--abbrev-ref", "HEAD"
-        ).strip()
-        if head_ref == "HEAD":
-            print("  → Warning: Repository is in detached HEAD state")
-            return True
-    except subprocess.CalledProcessError:
-        # HEAD doesn't exist - this is a new repo with no commits, which is safe
-        pass
+    if state.detached:
+        print("  → Warning: Repository is in detached HEAD state")
+        return True
 
     return False
 
@@ -48,11 +146,11 @@ def verify_working_directory_safety(target_dir: Path) -> bool:
     print("Verifying working directory safety...")
     
     try:
-        # Check if we're in a git repository
-        run_git_command(target_dir, "rev-parse", "--git-dir")
+        # A single status call; it fails outside a git repository
+        state = _collect_git_state(target_dir)
         
         # Check for dangerous git states
-        if check_dangerous_git_state(target_dir):
+        if check_dangerous_git_state(target_dir, state):
             print("  → Repository is in a potentially dangerous state")
             print(
                 "  → Please resolve any pending merges, rebases, or detached HEAD state"
@@ -60,18 +158,14 @@ def verify_working_directory_safety(target_dir: Path) -> bool:
             return False
         
         # Check if we have any uncommitted changes that could be lost
-        status_result = run_git_command_output(target_dir, "status", "--porcelain")
-        
-        if status_result.strip():
+        if state.changes:
             print("  → Found uncommitted changes in working directory")
             print("  → These changes will be preserved during operations")
             
-            # Show what changes exist
-            for line in status_result.strip().split('\n'):
-                if line:
-                    status = line[:2]
-                    filename = line[2:].lstrip()
-                    print(f"    → {status}: {filename}")
+            # Show what changes exist, in one write rather than a print per file
+            sys.stdout.write(
+                "".join(f"    → {status}: {filename}\n" for status, filename in state.changes)
+            )
         else:
             print("  → Working directory is clean")
         
@@ -85,20 +179,23 @@ def verify_working_directory_safety(target_dir: Path) -> bool:
 def create_safety_backup(target_dir: Path) -> Optional[Path]:
     """Create a backup of critical git state for safety."""
     try:
-        import tempfile
-        import shutil
-        from datetime import datetime
-        
         # Create a temporary backup directory
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_dir = Path(tempfile.gettempdir()) / f"git_womp_backup_{timestamp}"
+        # Unique per process, unlike a seconds-resolution timestamp
+        stamp = f"{time.time_ns():x}_{os.getpid()}"
+        backup_dir = Path(tempfile.gettempdir()) / f"git_womp_backup_{stamp}"
         backup_dir.mkdir(exist_ok=True)
         
         # Backup git index (staging area)
-        git_index = target_dir / ".git" / "index"
+        git_index = git_dir(target_dir) / "index"
         if git_index.exists():
             backup_index = backup_dir / "index"
-            shutil.copy2(git_index, backup_index)
+            try:
+                # Git never rewrites the index in place (it renames a new
+                # file over it), so a hard link is a zero-copy snapshot
+                os.link(git_index, backup_index)
+            except OSError:
+                # Different filesystem, or links not supported
+                shutil.copy2(git_index, backup_index)
             print(f"  → Created safety backup at: {backup_dir}")
             return backup_dir
         
@@ -113,38 +210,34 @@ def cleanup_backup(backup_dir: Optional[Path]) -> None:
     """Clean up safety backup files."""
     if backup_dir and backup_dir.exists():
         try:
-            import shutil
             shutil.rmtree(backup_dir)
             print(f"  → Cleaned up safety backup: {backup_dir}")
         except Exception as e:
             print(f"  → Warning: Could not clean up backup {backup_dir}: {e}")
 
 
+_DELETED = frozenset((" D", "D "))
+
+
+def _live_paths(status: str) -> Set[str]:
+    """Paths in a `snapshot_status` listing that aren't deletions.
+
+    Expects the listing as is (not `.strip()`ped): every line has the fixed
+    layout of two status letters, a space, then the path.
+    """
+    return {line[3:] for line in status.splitlines() if line and line[:2] not in _DELETED}
+
+
 def verify_no_files_deleted(target_dir: Path, original_status: str) -> bool:
     """Verify that no files were deleted during the operation."""
     try:
-        current_status = run_git_command_output(target_dir, "status", "--porcelain")
-        
-        # Parse original and current status to check for deletions
-        original_files: set[str] = set()
-        current_files: set[str] = set()
-        
-        for line in original_status.strip().split('\n'):
-            if line:
-                status = line[:2]
-                filename = line[2:].lstrip()
-                if status not in [' D', 'D ']:  # Not deleted
-                    original_files.add(filename)
-        
-        for line in current_status.strip().split('\n'):
-            if line:
-                status = line[:2]
-                filename = line[2:].lstrip()
-                if status not in [' D', 'D ']:  # Not deleted
-                    current_files.add(filename)
+        # Always a fresh status: a commit needn't touch what the cache is keyed on
+        current_status = _render_status(
+            _entry_status(entry) for entry in get_repo_state(target_dir).entries
+        )
         
         # Check if any files that existed before are missing now
-        missing_files = original_files - current_files
+        missing_files = _live_paths(original_status) - _live_paths(current_status)
         if missing_files:
             print(f"  → Warning: {len(missing_files)} files appear to be missing:")
             for file in missing_files:
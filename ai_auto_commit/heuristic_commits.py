@@ -2,17 +2,15 @@
 
 from __future__ import annotations
 
-# Import modules - handle both package and direct script execution
-try:
-    from .llm_client import get_token_usage, invoke_llm
-    from .prompts import PROMPT_HEADER
-    from .token_budget import refund_tokens, try_reserve_tokens
-    from .token_utils import token_len
-except ImportError:
-    from llm_client import get_token_usage, invoke_llm
-    from prompts import PROMPT_HEADER
-    from token_budget import refund_tokens, try_reserve_tokens
-    from token_utils import token_len
+import re
+from collections import Counter
+from typing import Optional
+
+from .llm_client import get_token_usage, invoke_llm
+from .prompts import PROMPT_HEADER
+from .response_cache import get_cached_response, response_key, store_response
+from .token_budget import refund_tokens, try_reserve_tokens
+from .token_utils import token_len
 
 
 def parse_name_status(output: str) -> dict[str, str]:
@@ -57,84 +55,196 @@ def parse_numstat(output: str) -> dict[str, tuple[int, int]]:
     return stats
 
 
+def parse_raw_numstat(
+    output: str,
+) -> tuple[dict[str, str], dict[str, tuple[int, int]]]:
+    """Parse `git diff --cached --raw --numstat -z` in a single pass.
+
+    Returns the same ({path: status}, {path: (added, deleted)}) mappings as
+    `parse_name_status` and `parse_numstat`. NUL-delimited records keep paths
+    with tabs or spaces intact; renames and copies are keyed by their new path
+    in both mappings.
+    """
+    mapping: dict[str, str] = {}
+    stats: dict[str, tuple[int, int]] = {}
+    fields = output.split('\0')
+    i = 0
+    while i < len(fields):
+        field = fields[i]
+        if not field:
+            i += 1
+        elif field.startswith(':'):
+            # ":<old mode> <new mode> <old sha> <new sha> <status>" then path(s)
+            status = field.rsplit(' ', 1)[-1]
+            if status[0] in 'RC':
+                mapping[fields[i + 2]] = status[0]
+                i += 3
+            else:
+                mapping[fields[i + 1]] = status[0]
+                i += 2
+        else:
+            # "<added>\t<deleted>\t<path>", or an empty path followed by
+            # the old and new paths for renames/copies
+            added_str, deleted_str, path = field.split('\t', 2)
+            if path:
+                i += 1
+            else:
+                path = fields[i + 2]
+                i += 3
+            added = int(added_str) if added_str.isdigit() else 0
+            deleted = int(deleted_str) if deleted_str.isdigit() else 0
+            stats[path] = (added, deleted)
+    return mapping, stats
+
+
+# Every category test in one pattern, matched at the start of the path: each
+# branch is a lookahead over the whole path, and the alternation is tried in
+# priority order (tests, then docs, then tooling/config)
+_CATEGORY_RE = re.compile(
+    r"(?P<test>(?=.*test))"
+    r"|(?P<docs>(?=.*(?:readme|docs/|/doc/|\.md)))"
+    r"|(?P<chore>(?=.*(?:\.lock|bun\.lockb|pnpm-lock\.yaml|package-lock\.json)$"
+    r"|.*(?:config/|/config|\.toml|\.yaml|\.yml|\.json)))",
+    re.IGNORECASE,
+)
+
+
 def categorize_path(path: str) -> str:
     """Rough category for Conventional Commit scope/type heuristics."""
-    p = path.lower()
-    if "test" in p or p.endswith("_test.go") or "/tests/" in p:
-        return "test"
-    if any(seg in p for seg in ["readme", "docs/", "/doc/", ".md"]):
-        return "docs"
-    if any(p.endswith(ext) for ext in [
-        ".lock", "bun.lockb", "yarn.lock", "pnpm-lock.yaml", "package-lock.json"
-    ]):
-        return "chore"
-    if any(seg in p for seg in ["config/", "/config", ".toml", ".yaml", ".yml", ".json"]):
-        return "chore"
-    return "code"
+    match = _CATEGORY_RE.match(path)
+    return match.lastgroup if match else "code"
+
+
+_BULLET_TEMPLATES = {
+    "test": "- {verb} tests in {scope}: {name}{size}",
+    "docs": "- {verb} docs in {scope}: {name}{size}",
+    "chore": "- {verb} tooling/config in {scope}: {name}{size}",
+    "code": "- {verb} code in {scope}: {name}{size}",
+}
+_STATUS_VERBS = {"A": "Add", "D": "Remove", "R": "Rename", "C": "Copy"}
 
 
 def build_heuristic_bullets(
     file_status: dict[str, str], file_stats: dict[str, tuple[int, int]]
-) -> list[str]:
-    """Create short, informative bullets without sending diffs to the model."""
-    bullets: list[str] = []
+) -> list[tuple[str, str]]:
+    """Create short, informative bullets without sending diffs to the model.
+
+    Returns (bullet, category) pairs, so composing the commit can pick its
+    type from the categories instead of re-reading the bullet text.
+    """
+    # Paths that would produce the same bullet are dropped before formatting,
+    # keeping first-seen order
+    unique: dict[tuple, None] = {}
     for path, status in file_status.items():
-        added, deleted = file_stats.get(path, (0, 0))
-        category = categorize_path(path)
-        scope = path.split('/', 1)[0] if '/' in path else path
-        # Choose a verb based on status
-        if status == 'A':
-            verb = "Add"
-        elif status == 'D':
-            verb = "Remove"
-        elif status == 'R':
-            verb = "Rename"
-        elif status == 'C':
-            verb = "Copy"
-        else:
-            verb = "Update"
-        # Short file label for readability
-        short_name = path.split('/')[-1]
-        size_note = f"(+{added} -{deleted})" if (added or deleted) else ""
-        if category == "test":
-            bullets.append(
-                f"- {verb} tests in {scope}: {short_name} {size_note}".strip()
-            )
-        elif category == "docs":
-            bullets.append(
-                f"- {verb} docs in {scope}: {short_name} {size_note}".strip()
-            )
-        elif category == "chore":
-            bullets.append(
-                f"- {verb} tooling/config in {scope}: {short_name} {size_note}".strip()
-            )
-        else:
-            bullets.append(
-                f"- {verb} code in {scope}: {short_name} {size_note}".strip()
-            )
-    # De-duplicate while preserving order
-    seen: set[str] = set()
-    deduped: list[str] = []
-    for b in bullets:
-        if b not in seen:
-            seen.add(b)
-            deduped.append(b)
-    return deduped
+        unique[(
+            categorize_path(path),
+            _STATUS_VERBS.get(status, "Update"),
+            path.split('/', 1)[0],
+            # Short file label for readability
+            path.rpartition('/')[2],
+            file_stats.get(path, (0, 0)),
+        )] = None
+    return [
+        (_BULLET_TEMPLATES[category].format(
+            verb=verb,
+            scope=scope,
+            name=name,
+            size=f" (+{added} -{deleted})" if (added or deleted) else "",
+        ), category)
+        for category, verb, scope, name, (added, deleted) in unique
+    ]
+
+
+# Changes at or below both limits are described fully by the heuristic
+# bullets, so asking the model to rephrase them isn't worth a round-trip
+TRIVIAL_MAX_FILES = 2
+TRIVIAL_MAX_LINES = 9
+
+
+def is_trivial_change(file_stats: dict[str, tuple[int, int]]) -> bool:
+    """Whether staged changes are small enough to skip the LLM call."""
+    if not file_stats or len(file_stats) > TRIVIAL_MAX_FILES:
+        return False
+    return sum(added + deleted for added, deleted in file_stats.values()) <= TRIVIAL_MAX_LINES
+
+
+# Dependency lock files: their diffs are regenerated, never worth summarising
+LOCK_FILES = frozenset({
+    "package-lock.json", "pnpm-lock.yaml", "yarn.lock", "bun.lockb", "poetry.lock",
+    "Pipfile.lock", "uv.lock", "Cargo.lock", "composer.lock", "Gemfile.lock", "go.sum",
+})
+
+
+def classify_chunk(chunk: str) -> Optional[str]:
+    """Bullet for a single-file diff that needs no model to describe it.
+
+    Recognises pure renames, dependency lock files and edits that only add
+    or remove blank lines or trailing whitespace; returns None for anything
+    else.
+    """
+    lines = chunk.splitlines()
+    if not lines:
+        return None
+    path = lines[0].rstrip('"').rpartition(" b/")[2]
+    if "similarity index 100%" in chunk:
+        old = next((l[12:] for l in lines if l.startswith("rename from ")), None)
+        if old is not None:
+            return f"- Rename {old} to {path}"
+    if path.rpartition("/")[2] in LOCK_FILES:
+        return f"- Bump dependencies in {path}"
+    removed: list[str] = []
+    added: list[str] = []
+    in_hunk = False
+    for line in lines[1:]:
+        if line.startswith("@@"):
+            in_hunk = True
+        # Only blank lines and trailing whitespace count as cleanup: leading
+        # indentation and spaces inside lines (or strings) can change behaviour
+        elif in_hunk and line.startswith("-"):
+            removed.append(line[1:].rstrip())
+        elif in_hunk and line.startswith("+"):
+            added.append(line[1:].rstrip())
+    if (removed or added) and [l for l in removed if l] == [l for l in added if l]:
+        return f"- Whitespace cleanup in {path}"
+    return None
+
+
+# Kind under which composed messages are kept in the response cache
+_COMPOSED_KIND = "composed"
+
+_COMPOSE_PROMPT = (
+    PROMPT_HEADER
+    + "\nBelow are summarized staged changes (no raw diffs). "
+    "Write the final Conventional Commit message:\n\n"
+)
 
 
 def compose_commit_from_bullets(
-    bullets: list[str], model: str, temperature: float
+    bullets: list[tuple[str, str]],
+    model: str,
+    temperature: float,
+    use_cache: bool = True,
 ) -> str:
-    """Compose the final Conventional Commit from bullets with a single small call."""
-    bullets_text = "\n".join(bullets[:200])  # hard cap
-    prompt = (
-        PROMPT_HEADER
-        + "\nBelow are summarized staged changes (no raw diffs). "
-        "Write the final Conventional Commit message:\n\n"
-        + bullets_text
-    )
+    """Compose the final Conventional Commit from bullets with a single small call.
 
-    est_prompt = token_len(prompt)
+    `bullets` are the (bullet, category) pairs from `build_heuristic_bullets`.
+    A message composed earlier (in this or a past run) from the same bullets
+    with the same model and temperature is reused without a request, unless
+    `use_cache` is False; a fresh message replaces the cached one.
+    """
+    if not bullets:
+        return "chore: no changes"
+
+    bullets_text = "\n".join(text for text, _ in bullets[:200])  # hard cap
+    prompt = _COMPOSE_PROMPT + bullets_text
+    cache_key = response_key(prompt, model, temperature)
+    if use_cache:
+        cached = get_cached_response(_COMPOSED_KIND, cache_key)
+        if cached is not None:
+            return cached
+
+    # The fixed instruction is counted once (`token_len` is memoized)
+    est_prompt = token_len(_COMPOSE_PROMPT) + token_len(bullets_text)
     est_completion = 192
     if not try_reserve_tokens(est_prompt + est_completion):
         # If we cannot afford even this, return a local deterministic message
@@ -148,32 +258,25 @@ def compose_commit_from_bullets(
     )
     
     # Estimate actual token usage
-    prompt_tokens, completion_tokens = get_token_usage(model, prompt, content)
+    prompt_tokens, completion_tokens = get_token_usage(
+        model, prompt, content, prompt_tokens=est_prompt
+    )
     real_spent = prompt_tokens + completion_tokens
     if real_spent < est_prompt + est_completion:
         refund_tokens((est_prompt + est_completion) - real_spent)
     
     if content:
-        commit_msg = content.strip()
-        return commit_msg.strip("`").strip()
+        commit_msg = content.strip().strip("`").strip()
+        store_response(_COMPOSED_KIND, cache_key, commit_msg)
+        return commit_msg
     return compose_commit_from_bullets_local(bullets)
 
 
-def compose_commit_from_bullets_local(bullets: list[str]) -> str:
+def compose_commit_from_bullets_local(bullets: list[tuple[str, str]]) -> str:
     """Deterministic Conventional Commit if the API is unavailable/budgeted out."""
-    # Decide type by majority category hints in bullets
-    counts = {"test": 0, "docs": 0, "chore": 0, "code": 0}
-    for b in bullets:
-        if "tests" in b:
-            counts["test"] += 1
-        elif "docs" in b:
-            counts["docs"] += 1
-        elif "tooling/config" in b:
-            counts["chore"] += 1
-        else:
-            counts["code"] += 1
-    # Use lambda to avoid Optional[int] from dict.get typing
-    commit_type = max(counts.keys(), key=lambda k: counts[k])
+    # Decide type by the majority category; ties go to the earlier one here
+    counts = Counter(category for _, category in bullets)
+    commit_type = max(("test", "docs", "chore", "code"), key=counts.__getitem__)
     type_map = {"code": "chore", "chore": "chore", "docs": "docs", "test": "test"}
     cc_type = type_map.get(commit_type, "chore")
     title = {
@@ -182,9 +285,9 @@ def compose_commit_from_bullets_local(bullets: list[str]) -> str:
         "chore": "maintenance updates",
         "code": "update code",
     }[commit_type]
-    body_lines = bullets[:10]
+    parts = [f"{cc_type}: {title}", "", "Summary of changes"]
+    parts.extend(text for text, _ in bullets[:10])
     if len(bullets) > 10:
-        body_lines.append(f"- and {len(bullets) - 10} more changes")
-    body = "\n".join(body_lines)
-    return f"{cc_type}: {title}\n\nSummary of changes\n{body}"
+        parts.append(f"- and {len(bullets) - 10} more changes")
+    return "\n".join(parts)
 
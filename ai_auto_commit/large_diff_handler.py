@@ -7,22 +7,36 @@ Provides strategies for handling oversized diffs:
 
 from __future__ import annotations
 
+import atexit
+import concurrent.futures
+import os
 import sys
+import threading
 from typing import List, Literal, Optional
 
-# Import modules - handle both package and direct script execution
-try:
-    from .commit_generation import split_diff_by_file
-    from .llm_client import invoke_llm, get_token_usage
-    from .prompts import PROMPT_HEADER
-    from .token_budget import get_tokens_spent, get_max_token_budget, refund_tokens, try_reserve_tokens, reserve_tokens_soft, is_over_budget
-    from .token_utils import token_len
-except ImportError:
-    from commit_generation import split_diff_by_file
-    from llm_client import invoke_llm, get_token_usage
-    from prompts import PROMPT_HEADER
-    from token_budget import get_tokens_spent, get_max_token_budget, refund_tokens, try_reserve_tokens, reserve_tokens_soft, is_over_budget
-    from token_utils import token_len
+from .commit_generation import split_diff_by_file
+from .llm_client import invoke_llm, get_token_usage
+from .prompts import PROMPT_HEADER
+from .token_budget import get_tokens_spent, get_max_token_budget, refund_tokens, try_reserve_tokens, reserve_tokens_soft, is_over_budget
+from .token_utils import token_len
+
+
+# Worker threads for the summarisation requests, created on first use and
+# shared by every batch and recursion level for the rest of the process
+_summary_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_summary_pool_lock = threading.Lock()
+
+
+def _get_summary_pool() -> concurrent.futures.ThreadPoolExecutor:
+    global _summary_pool
+    with _summary_pool_lock:
+        if _summary_pool is None:
+            _summary_pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(32, (os.cpu_count() or 1) * 4),
+                thread_name_prefix="ai-auto-commit-summary",
+            )
+            atexit.register(_summary_pool.shutdown, wait=False)
+        return _summary_pool
 
 
 # Model context window sizes (in tokens)
@@ -190,6 +204,24 @@ def check_diff_exceeds_limit(diff: str, model_name: str) -> tuple[bool, int, int
     return diff_tokens > available_for_diff, diff_tokens, available_for_diff
 
 
+# Menu answers accepted by `prompt_large_diff_strategy` (empty = default)
+_STRATEGY_CHOICES: dict[str, Literal["split", "truncate", "cancel"]] = {
+    "": "split",
+    "1": "split",
+    "2": "truncate",
+    "3": "cancel",
+}
+# Prompt and retry hint are built from the choices so they can't drift apart
+_STRATEGY_KEYS = [key for key in _STRATEGY_CHOICES if key]
+_STRATEGY_DEFAULT = next(
+    key for key in _STRATEGY_KEYS if _STRATEGY_CHOICES[key] == _STRATEGY_CHOICES[""]
+)
+_STRATEGY_PROMPT = (
+    f"Select strategy [{'/'.join(_STRATEGY_KEYS)}, default: {_STRATEGY_DEFAULT}]: "
+)
+_STRATEGY_RETRY = f"Please enter {', '.join(_STRATEGY_KEYS[:-1])}, or {_STRATEGY_KEYS[-1]}."
+
+
 def prompt_large_diff_strategy() -> Literal["split", "truncate", "cancel"]:
     """
     Prompt the user to choose a strategy for handling a large diff.
@@ -216,16 +248,10 @@ def prompt_large_diff_strategy() -> Literal["split", "truncate", "cancel"]:
 
     while True:
         try:
-            choice = input("Select strategy [1-3, default: 1]: ").strip()
-
-            if not choice or choice == "1":
-                return "split"
-            elif choice == "2":
-                return "truncate"
-            elif choice == "3":
-                return "cancel"
-            else:
-                print("Please enter 1, 2, or 3.")
+            strategy = _STRATEGY_CHOICES.get(input(_STRATEGY_PROMPT).strip())
+            if strategy is not None:
+                return strategy
+            print(_STRATEGY_RETRY)
         except KeyboardInterrupt:
             print("\n\nOperation cancelled.")
             return "cancel"
@@ -325,8 +351,6 @@ def split_and_summarize_diff(
     str
         The generated commit message.
     """
-    import concurrent.futures
-
     print("  ⚠️  Token budget is a soft ceiling during batched processing; usage may exceed the configured limit.")
     chunks = split_diff_by_file(diff)
     print(f"  → Split into {len(chunks)} file diffs")
@@ -361,8 +385,6 @@ def split_and_summarize_diff(
     print(f"  → Grouped into {len(batches)} batches for summarization")
 
     # Summarize each batch
-    batch_summaries: List[str] = []
-
     def summarize_batch(batch: List[str]) -> str:
         """Summarize a batch of file diffs."""
         combined = "\n".join(batch)
@@ -390,7 +412,9 @@ def split_and_summarize_diff(
                 max_tokens=est_completion,
             )
 
-            prompt_tokens, completion_tokens = get_token_usage(model, prompt, content)
+            prompt_tokens, completion_tokens = get_token_usage(
+                model, prompt, content, prompt_tokens=est_prompt
+            )
             real_spent = prompt_tokens + completion_tokens
             if real_spent < est_prompt + est_completion:
                 refund_tokens((est_prompt + est_completion) - real_spent)
@@ -407,10 +431,19 @@ def split_and_summarize_diff(
                     files.append(file_path)
             return "- Update " + ", ".join(files[:5]) + ("..." if len(files) > 5 else "")
 
-    # Parallel summarization
+    # Parallel summarization; results are collected as they complete so a
+    # slow batch doesn't hold back the progress report of the others
     print("  → Summarizing batches...")
-    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
-        batch_summaries = list(pool.map(summarize_batch, batches))
+    pool = _get_summary_pool()
+    futures = {pool.submit(summarize_batch, batch): i for i, batch in enumerate(batches)}
+    batch_summaries: List[str] = [""] * len(batches)
+    for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+        batch_summaries[futures[future]] = future.result()
+        if len(batches) > 1:
+            sys.stdout.write(f"\r  → Summarized {done}/{len(batches)} batches")
+            sys.stdout.flush()
+    if len(batches) > 1:
+        sys.stdout.write("\n")
 
     # Combine summaries
     combined_summaries = "\n\n".join(batch_summaries)
@@ -475,9 +508,7 @@ def recursive_summarize(
         if chunk.strip():
             chunks.append(chunk)
 
-    summarized_chunks: List[str] = []
-
-    for chunk in chunks:
+    def condense(chunk: str) -> str:
         prompt = (
             "Condense the following change summaries into 2-3 key bullet points. "
             "Keep the most important changes, start each with a verb:\n\n" + chunk
@@ -496,16 +527,19 @@ def recursive_summarize(
                 max_tokens=est_completion,
             )
 
-            prompt_tokens, completion_tokens = get_token_usage(model, prompt, content)
+            prompt_tokens, completion_tokens = get_token_usage(
+                model, prompt, content, prompt_tokens=est_prompt
+            )
             real_spent = prompt_tokens + completion_tokens
             if real_spent < est_prompt + est_completion:
                 refund_tokens((est_prompt + est_completion) - real_spent)
 
-            summarized_chunks.append(content.strip() if content else chunk[:200])
+            return content.strip() if content else chunk[:200]
         except Exception:
             refund_tokens(est_prompt + est_completion)
-            summarized_chunks.append('\n'.join(chunk.split('\n')[:3]))
+            return '\n'.join(chunk.split('\n')[:3])
 
+    summarized_chunks = list(_get_summary_pool().map(condense, chunks))
     combined = '\n\n'.join(summarized_chunks)
 
     # Check if we need another round
@@ -579,7 +613,9 @@ def generate_final_commit_from_summaries(
             max_tokens=est_completion,
         )
 
-        prompt_tokens, completion_tokens = get_token_usage(model, prompt, content)
+        prompt_tokens, completion_tokens = get_token_usage(
+            model, prompt, content, prompt_tokens=est_prompt
+        )
         real_spent = prompt_tokens + completion_tokens
         if real_spent < est_prompt + est_completion:
             refund_tokens((est_prompt + est_completion) - real_spent)
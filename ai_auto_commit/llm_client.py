@@ -7,8 +7,14 @@ with LangChain as the execution backend.
 from __future__ import annotations
 
 import os
+import warnings
 from typing import Any, Optional
 
+# Suppress Pydantic V1 compatibility warning from langchain-core on Python 3.14+.
+# Registered here, next to the first LangChain import, rather than in the
+# package __init__ so importing the package alone leaves the filters untouched.
+warnings.filterwarnings("ignore", message="Core Pydantic V1")
+
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import HumanMessage, SystemMessage
 
@@ -313,6 +319,46 @@ def invoke_llm(
     str
         The model's response text.
     """
+    llm, messages = _prepare_call(model_name, prompt, temperature, max_tokens, system_prompt)
+    try:
+        response = llm.invoke(messages)
+
+        # Handle different response content formats
+        return _extract_response_content(response)
+
+    except Exception as e:
+        raise RuntimeError(f"Error invoking {model_name}: {e}")
+
+
+async def ainvoke_llm(
+    model_name: str,
+    prompt: str,
+    temperature: float = 0.2,
+    max_tokens: Optional[int] = None,
+    system_prompt: Optional[str] = None,
+) -> str:
+    """
+    Async variant of `invoke_llm`, for fanning out many requests at once.
+
+    Uses the provider's native async client where LangChain has one.
+    """
+    llm, messages = _prepare_call(model_name, prompt, temperature, max_tokens, system_prompt)
+    try:
+        response = await llm.ainvoke(messages)
+        return _extract_response_content(response)
+
+    except Exception as e:
+        raise RuntimeError(f"Error invoking {model_name}: {e}")
+
+
+def _prepare_call(
+    model_name: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: Optional[int],
+    system_prompt: Optional[str],
+) -> tuple[BaseChatModel, list]:
+    """Get the model instance and build the message list for one call."""
     llm = get_llm(model_name, temperature)
 
     # Set max_tokens if provided (not all models support this)
@@ -323,19 +369,11 @@ def invoke_llm(
         except Exception:
             pass  # Some models don't support max_tokens parameter
 
-    try:
-        messages = []
-        if system_prompt:
-            messages.append(SystemMessage(content=system_prompt))
-        messages.append(HumanMessage(content=prompt))
-
-        response = llm.invoke(messages)
-
-        # Handle different response content formats
-        return _extract_response_content(response)
-
-    except Exception as e:
-        raise RuntimeError(f"Error invoking {model_name}: {e}")
+    messages = []
+    if system_prompt:
+        messages.append(SystemMessage(content=system_prompt))
+    messages.append(HumanMessage(content=prompt))
+    return llm, messages
 
 
 def _extract_response_content(response: Any) -> str:
@@ -364,10 +402,14 @@ def get_token_usage(
     model_name: str,
     prompt: str,
     response: str,
+    prompt_tokens: Optional[int] = None,
 ) -> tuple[int, int]:
     """
     Estimate token usage for a prompt and response.
 
+    `prompt_tokens` may carry the count already taken for the prompt (e.g.
+    when reserving budget) so the prompt isn't tokenized a second time.
+
     Returns
     -------
     tuple[int, int]
@@ -376,7 +418,8 @@ def get_token_usage(
     from .token_utils import token_len
 
     # Use tiktoken estimation (approximation for all providers)
-    prompt_tokens = token_len(prompt)
+    if prompt_tokens is None:
+        prompt_tokens = token_len(prompt)
     completion_tokens = token_len(response)
 
     return prompt_tokens, completion_tokens
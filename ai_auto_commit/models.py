@@ -7,11 +7,13 @@ features like token budget are maintained locally.
 
 from __future__ import annotations
 
+import copy
+import functools
 import json
 import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Literal, Optional
+from typing import Literal, Optional, Tuple
 
 # Re-export from ai_model_picker for backwards compatibility
 from ai_model_picker import (
@@ -22,18 +24,20 @@ from ai_model_picker import (
     get_api_key as _get_api_key,
     set_api_key as _set_api_key,
     remove_api_key as _remove_api_key,
-    get_all_api_keys as _get_all_api_keys,
     get_api_key_with_fallback,
-    get_default_model as _get_default_model,
     set_default_model as _set_default_model,
     get_model_api_id,
     load_config,
     save_config,
     get_config_path as _picker_get_config_path,
+    UserConfig,
 )
 # App-specific config name
 APP_NAME = "ai_auto_commit"
 
+# Token budget used when none is configured
+_DEFAULT_TOKEN_BUDGET: int = 250_000
+
 # Provider types - includes all supported providers
 Provider = Literal[
     "openai", "anthropic", "google", "mistral", "cohere",
@@ -51,34 +55,39 @@ class ModelConfig:
     default: bool = False
 
 
-def get_model_config(model_name: str) -> Optional[ModelConfig]:
-    """Get configuration for a model by name (backwards compatibility)."""
-    # Try to find the model in available providers
-    providers = _get_available_providers()
-    for provider_key, provider_data in providers.items():
-        models = provider_data.get("models", [])
-        model_api_ids = provider_data.get("model_api_ids", {})
+@functools.lru_cache(maxsize=1)
+def _model_index() -> dict[str, tuple[str, str, str]]:
+    """Map every model display name and API ID to (provider, display_name, api_id).
 
-        # Check if model_name matches a display name
-        if model_name in models:
-            return ModelConfig(
-                name=model_api_ids.get(model_name, model_name),
-                provider=provider_key,
-                display_name=model_name,
-                description="",
+    Built in one pass over the provider catalog (which ai_model_picker
+    loads once per process). Lookups keep the original precedence: earlier
+    providers win, and within a provider a display name beats an API ID.
+    """
+    index: dict[str, tuple[str, str, str]] = {}
+    for provider_key, provider_data in _get_available_providers().items():
+        model_api_ids = provider_data.get("model_api_ids", {})
+        for display_name in provider_data.get("models", []):
+            index.setdefault(
+                display_name,
+                (provider_key, display_name, model_api_ids.get(display_name, display_name)),
             )
-
-        # Check if model_name matches an API ID
         for display_name, api_id in model_api_ids.items():
-            if api_id == model_name:
-                return ModelConfig(
-                    name=api_id,
-                    provider=provider_key,
-                    display_name=display_name,
-                    description="",
-                )
+            index.setdefault(api_id, (provider_key, display_name, api_id))
+    return index
 
-    return None
+
+def get_model_config(model_name: str) -> Optional[ModelConfig]:
+    """Get configuration for a model by name (backwards compatibility)."""
+    entry = _model_index().get(model_name)
+    if entry is None:
+        return None
+    provider_key, display_name, api_id = entry
+    return ModelConfig(
+        name=api_id,
+        provider=provider_key,
+        display_name=display_name,
+        description="",
+    )
 
 
 def get_models_by_provider(provider: Provider) -> list[ModelConfig]:
@@ -99,10 +108,17 @@ def get_models_by_provider(provider: Provider) -> list[ModelConfig]:
     ]
 
 
+@functools.lru_cache(maxsize=1)
+def _provider_keys() -> Tuple[Provider, ...]:
+    return tuple(k for k in _get_available_providers() if k != "none")
+
+
 def get_all_providers() -> list[Provider]:
-    """Get list of all available providers from model_picker (provider_models.json)."""
-    providers = _get_available_providers()
-    return [k for k in providers if k != "none"]
+    """Get list of all available providers from model_picker (provider_models.json).
+
+    The catalog is read once per process; each call returns a fresh list.
+    """
+    return list(_provider_keys())
 
 
 # Wrapper functions that use APP_NAME
@@ -116,22 +132,54 @@ def get_config_path() -> Path:
     return _picker_get_config_path(APP_NAME)
 
 
+# Decoded config file, keyed by (path, mtime_ns, size) of the file it came from
+_config_cache: Optional[Tuple[Tuple[str, int, int], dict]] = None
+
+
 def _load_local_config() -> dict:
-    """Load configuration from file (internal use for token budget)."""
+    """Load configuration from file (internal use for token budget).
+
+    The decoded JSON is kept in memory and only re-read when the file's
+    mtime or size changes, so repeated lookups within a run don't hit the
+    disk. Callers get their own copy and may modify it freely.
+    """
+    global _config_cache
     config_path = get_config_path()
-    if config_path.exists():
+    try:
+        st = config_path.stat()
+    except OSError:
+        return {}
+    key = (str(config_path), st.st_mtime_ns, st.st_size)
+    if _config_cache is None or _config_cache[0] != key:
         try:
             with open(config_path, "r") as f:
-                return json.load(f)
+                data = json.load(f)
         except (json.JSONDecodeError, IOError):
             return {}
-    return {}
+        _config_cache = (key, data)
+    return copy.deepcopy(_config_cache[1])
+
+
+def _forget_config() -> None:
+    """Drop the cached config after writing it (mtimes can be coarse)."""
+    global _config_cache
+    _config_cache = None
+
+
+def _user_config(config: Optional[dict] = None) -> UserConfig:
+    """The picker's view of the config file, served from the local cache.
+
+    Pass an already loaded `config` dict to derive several settings from a
+    single load.
+    """
+    return UserConfig.from_dict(_load_local_config() if config is None else config)
 
 
 def _save_local_config(config: dict) -> None:
     """Save configuration to file (internal use for token budget)."""
     config_path = get_config_path()
     config_path.parent.mkdir(parents=True, exist_ok=True)
+    _forget_config()
     try:
         with open(config_path, "w") as f:
             json.dump(config, f, indent=2)
@@ -141,16 +189,18 @@ def _save_local_config(config: dict) -> None:
 
 def set_default_model(model_name: str) -> None:
     """Set the default AI model to use."""
+    _forget_config()
     _set_default_model(model_name, APP_NAME)
 
 
-def get_default_model() -> str:
-    """Get the default model name."""
-    return _get_default_model(APP_NAME)
+def get_default_model(config: Optional[dict] = None) -> str:
+    """Get the default model name (from `config` when already loaded)."""
+    return _user_config(config).model
 
 
 def set_api_key(provider: Provider, api_key: str) -> None:
     """Set the API key for a specific provider."""
+    _forget_config()
     _set_api_key(provider, api_key, APP_NAME)
 
 
@@ -161,12 +211,13 @@ def get_api_key(provider: Provider) -> Optional[str]:
 
 def remove_api_key(provider: Provider) -> None:
     """Remove the stored API key for a specific provider."""
+    _forget_config()
     _remove_api_key(provider, APP_NAME)
 
 
 def get_all_api_keys() -> dict[Provider, str]:
     """Get all stored API keys."""
-    return _get_all_api_keys(APP_NAME)
+    return _user_config().api_keys
 
 
 def get_config() -> dict:
@@ -174,6 +225,20 @@ def get_config() -> dict:
     return _load_local_config()
 
 
+def get_editor() -> Optional[str]:
+    """Get the editor remembered by `config edit`, if any."""
+    return _load_local_config().get("editor")
+
+
+def set_editor(editor: str) -> None:
+    """Remember the editor found by `config edit` so later runs skip the probe."""
+    config = _load_local_config()
+    if config.get("editor") == editor:
+        return
+    config["editor"] = editor
+    _save_local_config(config)
+
+
 # Token budget functions (app-specific, kept locally)
 def set_token_budget(budget: int) -> None:
     """
@@ -197,15 +262,26 @@ def set_token_budget(budget: int) -> None:
     config["token_budget"] = budget
     _save_local_config(config)
 
+    # Drop the cached limit so the new budget applies immediately
+    from .token_budget import _get_max_token_budget
+    _get_max_token_budget.cache_clear()
+
 
-def get_token_budget() -> int:
+def get_token_budget(config: Optional[dict] = None) -> int:
     """
     Get the token budget limit.
 
+    Parameters
+    ----------
+    config : dict, optional
+        An already loaded configuration (see `get_config`). Loaded from
+        disk when omitted.
+
     Returns
     -------
     int
         The configured token budget, or 250000 if not set.
     """
-    config = _load_local_config()
-    return config.get("token_budget", 250_000)
+    if config is None:
+        config = _load_local_config()
+    return config.get("token_budget", _DEFAULT_TOKEN_BUDGET)
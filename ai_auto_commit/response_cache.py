@@ -0,0 +1,101 @@
+"""Cache of model responses, kept across runs so unchanged input isn't sent again."""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# Entries unused for this long are dropped
+_CACHE_MAX_AGE = 30 * 24 * 3600
+_cache_lock = threading.Lock()
+
+# Responses already looked up or stored in this process, checked before the
+# database (and still used when the database can't be opened)
+_memo: Dict[Tuple[str, str], str] = {}
+
+
+def _cache_path() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "ai_auto_commit" / "responses.db"
+
+
+@functools.lru_cache(maxsize=1)
+def _db() -> Optional[sqlite3.Connection]:
+    """Open the response cache, or None if it can't be used (caching is best effort)."""
+    try:
+        path = _cache_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS responses (kind TEXT NOT NULL, key TEXT NOT NULL, "
+            "response TEXT NOT NULL, used REAL NOT NULL, PRIMARY KEY (kind, key))"
+        )
+        db.execute("DELETE FROM responses WHERE used < ?", (time.time() - _CACHE_MAX_AGE,))
+        return db
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def reset() -> None:
+    """Forget responses held in memory and close the database connection."""
+    _memo.clear()
+    if _db.cache_info().currsize:  # don't open the database just to close it
+        db = _db()
+        if db is not None:
+            db.close()
+    _db.cache_clear()
+
+
+def response_key(prompt: str, model: str, temperature: float) -> str:
+    """Key for the response `model` gives to `prompt` at `temperature`."""
+    digest = hashlib.blake2b(prompt.encode("utf-8", "replace"), digest_size=16).hexdigest()
+    return f"{model}:{temperature}:{digest}"
+
+
+def get_cached_response(kind: str, key: str) -> Optional[str]:
+    """Return the response stored under `kind` (e.g. "bullet") and `key`, if any."""
+    cached = _memo.get((kind, key))
+    if cached is not None:
+        return cached
+    db = _db()
+    if db is None:
+        return None
+    try:
+        with _cache_lock:
+            row = db.execute(
+                "SELECT response FROM responses WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            if row is not None:
+                db.execute(
+                    "UPDATE responses SET used = ? WHERE kind = ? AND key = ?",
+                    (time.time(), kind, key),
+                )
+    except sqlite3.Error:
+        return None
+    if row is None:
+        return None
+    _memo[(kind, key)] = row[0]
+    return row[0]
+
+
+def store_response(kind: str, key: str, response: str) -> None:
+    """Store `response` under `kind` and `key`, replacing any earlier one."""
+    _memo[(kind, key)] = response
+    db = _db()
+    if db is None:
+        return
+    try:
+        with _cache_lock:
+            db.execute(
+                "INSERT OR REPLACE INTO responses (kind, key, response, used) "
+                "VALUES (?, ?, ?, ?)",
+                (kind, key, response, time.time()),
+            )
+    except sqlite3.Error:
+        pass
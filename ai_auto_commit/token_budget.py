@@ -2,23 +2,22 @@
 
 from __future__ import annotations
 
+import functools
 import threading
 
-# Import config functions - handle both package and direct script execution
-try:
-    from .models import _load_local_config
-except ImportError:
-    from ai_auto_commit.models import _load_local_config
+from .models import _DEFAULT_TOKEN_BUDGET, _load_local_config
 
 _tokens_spent: int = 0
 _budget_lock = threading.Lock()
 
-# Default token budget
-_DEFAULT_TOKEN_BUDGET: int = 250_000
-
 
+@functools.lru_cache(maxsize=1)
 def _get_max_token_budget() -> int:
-    """Get the maximum token budget from config or default."""
+    """Get the maximum token budget from config or default.
+
+    Cached because it is consulted on every reservation; `reset_token_budget`
+    and `set_token_budget` clear the cache.
+    """
     config = _load_local_config()
     return config.get("token_budget", _DEFAULT_TOKEN_BUDGET)
 
@@ -71,6 +70,8 @@ def reset_token_budget() -> None:
     global _tokens_spent
     with _budget_lock:
         _tokens_spent = 0
+    # Pick up any config change made since the previous run
+    _get_max_token_budget.cache_clear()
 
 
 def get_tokens_spent() -> int:
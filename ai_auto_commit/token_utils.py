@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
+import functools
+
 import tiktoken
 
 # Initialize tiktoken encoder for token counting
 ENC = tiktoken.encoding_for_model("gpt-4o-mini")
 
 
+@functools.lru_cache(maxsize=256)
 def token_len(text: str) -> int:
-    """Get token count for text using tiktoken."""
-    return len(ENC.encode(text))
+    """Get token count for text using tiktoken.
 
+    Results are memoized: the same diff is measured by the orchestrator, the
+    large-diff handler and the prompt estimators within a single run, and
+    tokenizing a large diff is linear in its size.
+    """
+    return len(ENC.encode(text))
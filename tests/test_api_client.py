@@ -0,0 +1,55 @@
+from ai_auto_commit import api_client
+
+
+def test_check_network_connectivity_caches_result(monkeypatch):
+    monkeypatch.setattr(api_client, "_network_checks", {})
+    monkeypatch.setattr(api_client, "_network_probes", {})
+    calls = []
+
+    def fake_probe(host, port, timeout):
+        calls.append((host, port))
+        return True
+
+    monkeypatch.setattr(api_client, "_probe_network", fake_probe)
+    assert api_client.check_network_connectivity("example.invalid", 443)
+    assert api_client.check_network_connectivity("example.invalid", 443)
+    assert calls == [("example.invalid", 443)]
+
+
+def test_check_network_connectivity_uses_prefetched_probe(monkeypatch):
+    monkeypatch.setattr(api_client, "_network_checks", {})
+    monkeypatch.setattr(api_client, "_network_probes", {})
+    calls = []
+
+    def fake_probe(host, port, timeout):
+        calls.append((host, port))
+        return False
+
+    monkeypatch.setattr(api_client, "_probe_network", fake_probe)
+    api_client.prefetch_network_connectivity("example.invalid", 443)
+    assert api_client.check_network_connectivity("example.invalid", 443) is False
+    assert calls == [("example.invalid", 443)]
+
+
+def test_init_initializes_each_provider_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(api_client, "initialize_provider", lambda p, k: calls.append((p, k)))
+    monkeypatch.setattr(
+        api_client, "get_all_api_keys", lambda: {"openai": "stored", "anthropic": "a"}
+    )
+    api_client.init(" explicit ", provider="openai", anthropic="kw")
+    assert sorted(calls) == [("anthropic", "kw"), ("openai", "explicit")]
+
+
+def test_check_network_connectivity_reprobes_after_stale_prefetch(monkeypatch):
+    monkeypatch.setattr(api_client, "_network_checks", {})
+    monkeypatch.setattr(api_client, "_network_probes", {})
+    answers = [True, False]
+
+    monkeypatch.setattr(api_client, "_probe_network", lambda host, port, timeout: answers.pop(0))
+    api_client.prefetch_network_connectivity("example.invalid", 443)
+    api_client._network_probes[("example.invalid", 443)].result()
+    now = api_client.time.monotonic() + api_client._NETWORK_CHECK_TTL + 1
+    monkeypatch.setattr(api_client.time, "monotonic", lambda: now)
+    assert api_client.check_network_connectivity("example.invalid", 443) is False
+    assert answers == []
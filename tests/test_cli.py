@@ -0,0 +1,296 @@
+import pytest
+
+from ai_auto_commit import cli
+
+
+@pytest.mark.parametrize("argv, expected", [
+    (["--set-default-model", "gpt-4o"], "gpt-4o"),
+    (["--set-default-model=gpt-4o"], "gpt-4o"),
+    (["--set-default-model="], None),
+    (["--set-default-model", "--help"], None),
+    (["--model", "gpt-4o"], None),
+    (["--set-default-model", "gpt-4o", "--remote", "up"], None),
+    ([], None),
+])
+def test_fast_set_default_model(argv, expected):
+    assert cli._fast_set_default_model(argv) == expected
+
+
+def test_main_sets_default_model_without_full_parser(monkeypatch):
+    saved = []
+    monkeypatch.setattr(cli.sys, "argv", ["autocommit", "--set-default-model", "my-model"])
+    monkeypatch.setattr(cli, "_set_default_model", saved.append)
+    cli.main()
+    assert saved == ["my-model"]
+
+
+def test_config_get_does_not_load_commit_pipeline(tmp_path):
+    import os
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "sys.argv = ['autocommit', 'config', 'get']\n"
+        "from ai_auto_commit.cli import main\n"
+        "main()\n"
+        "heavy = [m for m in ('langchain_core', 'InquirerPy', 'ai_auto_commit.llm_client',"
+        " 'ai_auto_commit.ai_auto_commit') if m in sys.modules]\n"
+        "print('HEAVY', heavy)\n"
+    )
+    env = dict(os.environ, HOME=str(tmp_path), XDG_CONFIG_HOME=str(tmp_path / ".config"))
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+    )
+    assert "HEAVY []" in result.stdout
+
+
+def test_config_edit_probes_editors_without_subprocesses(monkeypatch, tmp_path):
+    import shutil
+    import subprocess
+
+    from ai_auto_commit import models
+
+    config_path = tmp_path / "config.json"
+    config_path.write_text("{}")
+    monkeypatch.setattr(models, "get_config_path", lambda: config_path)
+    monkeypatch.delenv("EDITOR", raising=False)
+    monkeypatch.delenv("VISUAL", raising=False)
+    monkeypatch.setattr(shutil, "which", lambda name: "/usr/bin/vi" if name == "vi" else None)
+    launched = []
+    monkeypatch.setattr(subprocess, "run", lambda cmd, **kw: launched.append(cmd))
+    monkeypatch.setattr(cli.sys, "argv", ["autocommit", "config", "edit"])
+    cli.main()
+    assert launched == [["vi", str(config_path)]]
+
+
+def test_config_edit_creates_missing_config_only(monkeypatch, tmp_path):
+    import subprocess
+
+    from ai_auto_commit import models
+
+    config_path = tmp_path / "nested" / "config.json"
+    monkeypatch.setattr(models, "get_config_path", lambda: config_path)
+    monkeypatch.setenv("EDITOR", "true")
+    monkeypatch.setattr(subprocess, "run", lambda cmd, **kw: None)
+    monkeypatch.setattr(cli.sys, "argv", ["autocommit", "config", "edit"])
+    cli.main()
+    assert config_path.read_text() == "{}"
+
+    config_path.write_text('{"editor": "vim"}')
+    cli.main()
+    assert config_path.read_text() == '{"editor": "vim"}'
+
+
+def test_config_edit_remembers_probed_editor(monkeypatch, tmp_path):
+    import json
+    import shutil
+    import subprocess
+
+    from ai_auto_commit import models
+
+    config_path = tmp_path / "config.json"
+    config_path.write_text("{}")
+    monkeypatch.setattr(models, "get_config_path", lambda: config_path)
+    monkeypatch.setattr(models, "_config_cache", None)
+    monkeypatch.delenv("EDITOR", raising=False)
+    monkeypatch.delenv("VISUAL", raising=False)
+    probed = []
+
+    def fake_which(name):
+        probed.append(name)
+        return "/usr/bin/vim" if name == "vim" else None
+
+    monkeypatch.setattr(shutil, "which", fake_which)
+    monkeypatch.setattr(subprocess, "run", lambda cmd, **kw: None)
+    monkeypatch.setattr(cli.sys, "argv", ["autocommit", "config", "edit"])
+    cli.main()
+    assert json.loads(config_path.read_text())["editor"] == "vim"
+    assert probed == ["nano", "vim"]
+
+    probed.clear()
+    cli.main()
+    assert probed == ["vim"]  # only the remembered editor is re-checked
+
+
+def test_prompt_for_files_lists_changes(monkeypatch, tmp_path, capsys):
+    from InquirerPy import inquirer
+
+    monkeypatch.setattr(cli, "_stdin_is_tty", lambda: True)
+    from ai_auto_commit import git_operations
+
+    monkeypatch.setattr(
+        git_operations, "run_git_command_output", lambda target_dir, *args: " M a.py\n"
+    )
+
+    class _Prompt:
+        def execute(self):
+            return "a.py"
+
+    monkeypatch.setattr(inquirer, "text", lambda **kwargs: _Prompt())
+    assert cli.prompt_for_files(tmp_path) == "a.py"
+    out = capsys.readouterr().out
+    assert out.index("File Selection") < out.index("Available changes:") < out.index(" M a.py")
+
+
+def test_prompt_for_files_does_not_wait_for_slow_status(monkeypatch, tmp_path, capsys):
+    import threading
+
+    from InquirerPy import inquirer
+
+    from ai_auto_commit import git_operations
+
+    release = threading.Event()
+    monkeypatch.setattr(cli, "_stdin_is_tty", lambda: True)
+    monkeypatch.setattr(cli, "_STATUS_WAIT", 0.01)
+    monkeypatch.setattr(git_operations, "status_short", lambda target_dir: release.wait(5) and "")
+
+    class _Prompt:
+        def execute(self):
+            return ""
+
+    monkeypatch.setattr(inquirer, "text", lambda **kwargs: _Prompt())
+    try:
+        assert cli.prompt_for_files(tmp_path) == "."
+    finally:
+        release.set()
+    assert "Still collecting changes" in capsys.readouterr().out
+
+
+def test_prompt_for_model_falls_back_to_default(monkeypatch, capsys):
+    import ai_model_picker
+
+    from ai_auto_commit import models
+
+    monkeypatch.setattr(cli, "_stdin_is_tty", lambda: True)
+    monkeypatch.setattr(ai_model_picker, "select_provider", lambda title: None)
+    monkeypatch.setattr(models, "get_default_model", lambda: "fallback-model")
+    assert cli.prompt_for_model() == "fallback-model"
+    assert capsys.readouterr().out == f"\n{cli._SEP}\n🤖 Model Selection\n{cli._SEP}\n"
+
+
+@pytest.mark.parametrize("argv, handler, expected_args", [
+    (["init"], "_run_setup_wizard", ()),
+    (["config", "get"], "_config_get", ()),
+    (["config", "edit"], "_config_edit", ()),
+    (["config", "set", "token-budget", "5000"], "_config_set", ("token-budget", "5000")),
+])
+def test_light_commands_skip_argparse(monkeypatch, argv, handler, expected_args):
+    import argparse
+
+    def no_parser(*args, **kwargs):
+        raise AssertionError("argparse parser should not be built")
+
+    calls = []
+    monkeypatch.setattr(argparse, "ArgumentParser", no_parser)
+    monkeypatch.setattr(cli, handler, lambda *args: calls.append(args))
+    monkeypatch.setattr(cli.sys, "argv", ["autocommit", *argv])
+    cli.main()
+    assert calls == [expected_args]
+
+
+@pytest.mark.parametrize("argv", [
+    ["config"],
+    ["config", "get", "--help"],
+    ["config", "set", "colour", "blue"],
+    ["init", "--verbose"],
+    ["--model", "gpt-4o"],
+])
+def test_other_invocations_use_full_parser(argv):
+    assert cli._dispatch_light(argv) is False
+
+
+def test_prompt_for_commit_comment_non_interactive_output(capsys):
+    assert cli.prompt_for_commit_comment("feat: x", non_interactive=True) == "feat: x"
+    sep = "=" * 60
+    assert capsys.readouterr().out == f"\n{sep}\n📝 Generated Commit Message\n{sep}\nfeat: x\n{sep}\n"
+
+
+def test_prompt_for_commit_comment_prepends_comment(monkeypatch, capsys):
+    from InquirerPy import inquirer
+
+    monkeypatch.setattr(cli, "_stdin_is_tty", lambda: True)
+    class _Prompt:
+        def execute(self):
+            return "  note  "
+
+    monkeypatch.setattr(inquirer, "text", lambda **kwargs: _Prompt())
+    assert cli.prompt_for_commit_comment("feat: x") == "note\n\nfeat: x"
+    out = capsys.readouterr().out
+    assert out.index("Press Enter to proceed") < out.index("📋 Final commit message:")
+
+
+def test_prompts_resolve_to_defaults_without_a_tty(monkeypatch, tmp_path, capsys):
+    from InquirerPy import inquirer
+
+    from ai_auto_commit import git_operations, models
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should not prompt or run git")
+
+    monkeypatch.setattr(cli, "_stdin_is_tty", lambda: False)
+    monkeypatch.setattr(inquirer, "text", fail)
+    monkeypatch.setattr(inquirer, "select", fail)
+    monkeypatch.setattr(git_operations, "run_git_command_output", fail)
+    monkeypatch.setattr(models, "get_default_model", lambda: "default-model")
+    assert cli.prompt_for_files(tmp_path) == "."
+    assert cli.prompt_for_model() == "default-model"
+    assert cli.prompt_for_commit_comment("feat: x") == "feat: x"
+    assert cli.confirm_commit_and_push(tmp_path, "feat: x", "origin") == (True, "feat: x")
+    assert "Generated Commit Message" in capsys.readouterr().out
+
+
+def test_prompt_for_commit_comment_uses_given_comment(monkeypatch):
+    from InquirerPy import inquirer
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should not prompt")
+
+    monkeypatch.setattr(cli, "_stdin_is_tty", lambda: True)
+    monkeypatch.setattr(inquirer, "text", fail)
+    assert cli.prompt_for_commit_comment("feat: x", comment=" note ") == "note\n\nfeat: x"
+
+
+def test_main_yes_answers_every_prompt_with_its_default(monkeypatch):
+    from ai_auto_commit import ai_auto_commit, api_client
+
+    calls = []
+    monkeypatch.setattr(api_client, "init", lambda **kwargs: None)
+    monkeypatch.setattr(
+        ai_auto_commit, "auto_commit_and_push", lambda **kwargs: calls.append(kwargs) or "msg"
+    )
+    monkeypatch.setattr(cli.sys, "argv", ["autocommit", "-y", "--comment", "note"])
+    cli.main()
+    assert calls[0]["large_diff_strategy"] == "split"
+    assert calls[0]["auto_recover_push"] is True
+    assert calls[0]["non_interactive"] is True
+    assert calls[0]["comment"] == "note"
+
+
+def test_help_does_not_load_provider_catalog(tmp_path):
+    import os
+    import subprocess
+    import sys
+
+    code = (
+        "import sys\n"
+        "sys.argv = ['autocommit', '--help']\n"
+        "from ai_auto_commit import cli\n"
+        "try:\n"
+        "    cli.main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('LOADED', sorted(m for m in ('ai_model_picker', 'ai_auto_commit.models') if m in sys.modules))\n"
+    )
+    env = dict(os.environ, HOME=str(tmp_path), XDG_CONFIG_HOME=str(tmp_path / ".config"))
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+    )
+    assert "LOADED []" in result.stdout
+
+
+def test_main_rejects_unknown_provider(monkeypatch, capsys):
+    monkeypatch.setattr(cli.sys, "argv", ["autocommit", "--provider", "nope"])
+    with pytest.raises(SystemExit):
+        cli.main()
+    assert "invalid choice: 'nope'" in capsys.readouterr().err
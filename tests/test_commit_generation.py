@@ -0,0 +1,213 @@
+import asyncio
+
+import pytest
+
+from ai_auto_commit import commit_generation, response_cache, token_budget
+from ai_auto_commit.token_budget import get_tokens_spent, reset_token_budget
+
+
+def _chunk(name):
+    return f"diff --git a/{name} b/{name}\n+change\n"
+
+
+def test_summarise_file_diffs_runs_concurrently_in_order(monkeypatch):
+    active = 0
+    peak = 0
+
+    async def fake_ainvoke(model_name, prompt, temperature, max_tokens):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return "Update " + prompt.rsplit("b/", 1)[1].split("\n")[0]
+
+    monkeypatch.setattr(commit_generation, "ainvoke_llm", fake_ainvoke)
+    monkeypatch.setattr(commit_generation, "STAGE1_CONCURRENCY", 4)
+    monkeypatch.setattr(commit_generation, "_BATCH_CHUNK_TOKENS", 0)  # one request per file
+    reset_token_budget()
+    names = [f"f{i}.py" for i in range(10)]
+    bullets = commit_generation.summarise_file_diffs([_chunk(n) for n in names], "gpt-4o-mini", 0.2)
+    assert bullets == [f"- Update {n}" for n in names]
+    assert peak == 4
+
+
+def test_stage1_reserves_budget_only_when_a_slot_is_free(monkeypatch):
+    async def fake_ainvoke(model_name, prompt, temperature, max_tokens):
+        await asyncio.sleep(0)
+        return "Add a"
+
+    monkeypatch.setattr(commit_generation, "ainvoke_llm", fake_ainvoke)
+    monkeypatch.setattr(commit_generation, "STAGE1_CONCURRENCY", 1)
+    monkeypatch.setattr(commit_generation, "_BATCH_CHUNK_TOKENS", 0)  # one request per file
+    chunks = [_chunk("a.py"), _chunk("b.py")]
+    est_prompt = commit_generation._summary_prompt_tokens(chunks[0])
+    reset_token_budget()
+    # Room for one full reservation plus what the first request really spends,
+    # but not for both reservations at once
+    monkeypatch.setattr(token_budget, "_get_max_token_budget", lambda: 2 * est_prompt + 64 + 10)
+    assert commit_generation.summarise_file_diffs(chunks, "gpt-4o-mini", 0.2) == ["- Add a"] * 2
+
+
+def test_summarise_file_diffs_falls_back_per_chunk(monkeypatch):
+    async def failing(**kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(commit_generation, "ainvoke_llm", failing)
+    reset_token_budget()
+    assert commit_generation.summarise_file_diffs([_chunk("a.py")], "gpt-4o-mini", 0.2) == [
+        "- Update b/a.py"
+    ]
+
+
+def test_estimate_stage1_budget_tokenizes_only_the_header(monkeypatch):
+    measured = []
+
+    def fake_token_len(text):
+        measured.append(text)
+        return len(text)
+
+    monkeypatch.setattr(commit_generation, "token_len", fake_token_len)
+    chunks = [_chunk(f"f{i}.py") for i in range(3)]
+    avg, _ = commit_generation.estimate_stage1_budget(chunks, "gpt-4o-mini", 0.2)
+    assert set(measured) == {commit_generation._SUMMARY_PROMPT}
+    assert avg == len(commit_generation._SUMMARY_PROMPT) + len(chunks[0]) // 4 + 64
+
+
+def test_group_bullets_groups_by_verb_in_first_seen_order():
+    bullets = ["- Fix b", "- Add x", "- fix a", "- Update y", "- Add w", "-", "-   "]
+    assert commit_generation._group_bullets(bullets) == (
+        "- Fix b\n- fix a\n- Add x\n- Add w\n- Update y\n-\n-   "
+    )
+
+
+def test_summaries_are_reused_across_runs(monkeypatch, cache_db):
+    calls = []
+
+    async def fake_ainvoke(**kwargs):
+        calls.append(kwargs["model_name"])
+        return "Add feature"
+
+    monkeypatch.setattr(commit_generation, "ainvoke_llm", fake_ainvoke)
+    chunks = [_chunk("a.py")]
+    reset_token_budget()
+    assert commit_generation.summarise_file_diffs(chunks, "gpt-4o-mini", 0.2) == ["- Add feature"]
+    assert cache_db.exists()
+
+    response_cache.reset()  # as in a new process
+    reset_token_budget()
+    assert commit_generation.summarise_file_diffs(chunks, "gpt-4o-mini", 0.2) == ["- Add feature"]
+    assert calls == ["gpt-4o-mini"]
+    assert get_tokens_spent() == 0
+
+    # A different model is a different cache entry
+    commit_generation.summarise_file_diffs(chunks, "gpt-4o", 0.2)
+    assert calls == ["gpt-4o-mini", "gpt-4o"]
+
+    # Bypassing the cache asks again
+    commit_generation.summarise_file_diffs(chunks, "gpt-4o", 0.2, use_cache=False)
+    assert calls == ["gpt-4o-mini", "gpt-4o", "gpt-4o"]
+
+
+def test_split_diff_by_file_slices_at_line_start_headers():
+    first = "diff --git a/p.patch b/p.patch\n+diff --git a/x b/x\n+more\n"
+    second = "diff --git a/b.py b/b.py\n-old\n+new"
+    assert commit_generation.split_diff_by_file(first + second) == [first, second]
+    assert commit_generation.split_diff_by_file("") == []
+
+
+def test_small_chunks_are_batched_into_one_request(monkeypatch):
+    import re
+
+    prompts = []
+
+    async def fake_ainvoke(model_name, prompt, temperature, max_tokens):
+        prompts.append(prompt)
+        if prompt.startswith(commit_generation._BATCH_PROMPT):
+            files = re.findall(r"^<FILE (\d+)>\ndiff --git a/(\S+)", prompt, re.MULTILINE)
+            # The answer leaves out the last file
+            return "\n".join(f"<FILE {n}>: Update {name}" for n, name in files[:-1])
+        return "Touch " + prompt.rsplit("b/", 1)[1].split("\n")[0]
+
+    monkeypatch.setattr(commit_generation, "ainvoke_llm", fake_ainvoke)
+    reset_token_budget()
+    names = ["a.py", "b.py", "c.py"]
+    bullets = commit_generation.summarise_file_diffs(
+        [_chunk(n) for n in names], "gpt-4o-mini", 0.2
+    )
+    assert bullets == ["- Update a.py", "- Update b.py", "- Touch c.py"]
+    assert len(prompts) == 2
+
+
+def test_pack_batches_first_fit_decreasing(monkeypatch):
+    monkeypatch.setattr(commit_generation, "_BATCH_TOKENS", 10)
+    assert commit_generation._pack_batches({0: 3, 1: 7, 2: 6, 3: 4, 4: 11}) == [
+        [4], [1, 0], [2, 3]
+    ]
+
+
+def test_stage1_prompt_is_tokenized_once_per_request(monkeypatch):
+    measured = []
+    real = commit_generation.token_len
+
+    def counting(text):
+        measured.append(text)
+        return real(text)
+
+    async def fake_ainvoke(**kwargs):
+        return "Add feature"
+
+    monkeypatch.setattr(commit_generation, "token_len", counting)
+    monkeypatch.setattr("ai_auto_commit.token_utils.token_len", counting)
+    monkeypatch.setattr(commit_generation, "ainvoke_llm", fake_ainvoke)
+    reset_token_budget()
+    chunk = _chunk("a.py")
+    commit_generation.summarise_file_diffs([chunk], "gpt-4o-mini", 0.2)
+    assert commit_generation._SUMMARY_PROMPT + chunk not in measured
+
+
+def test_retry_probes_network_only_after_a_network_error(monkeypatch):
+    probes = []
+    replies = iter([RuntimeError("Connection reset"), "feat: add x"])
+
+    def fake_invoke(**kwargs):
+        reply = next(replies)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    monkeypatch.setattr(commit_generation, "invoke_llm", fake_invoke)
+    monkeypatch.setattr(
+        commit_generation, "check_network_connectivity", lambda: probes.append(1) or True
+    )
+    monkeypatch.setattr("time.sleep", lambda s: None)
+    reset_token_budget()
+    assert commit_generation.generate_commit_message_with_retry("p", "gpt-4o-mini", 0.2) == "feat: add x"
+    assert probes == [1]
+
+
+def test_retry_gives_up_when_network_is_down(monkeypatch):
+    calls = []
+
+    def fake_invoke(**kwargs):
+        calls.append(1)
+        raise RuntimeError("Connection timeout")
+
+    monkeypatch.setattr(commit_generation, "invoke_llm", fake_invoke)
+    monkeypatch.setattr(commit_generation, "check_network_connectivity", lambda: False)
+    monkeypatch.setattr(commit_generation, "generate_fallback_commit_message", lambda: "fallback")
+    reset_token_budget()
+    assert commit_generation.generate_commit_message_with_retry("p", "gpt-4o-mini", 0.2) == "fallback"
+    assert calls == [1]
+
+
+@pytest.mark.parametrize("reply, expected", [
+    ("```\nfeat: add x\n```", "feat: add x"),
+    ("```feat: add x", "feat: add x"),
+    ("feat: add x\n```", "feat: add x"),
+    ("feat: use `x` and ```y```z", "feat: use `x` and ```y```z"),
+])
+def test_retry_strips_code_fences(monkeypatch, reply, expected):
+    monkeypatch.setattr(commit_generation, "invoke_llm", lambda **kwargs: reply)
+    reset_token_budget()
+    assert commit_generation.generate_commit_message_with_retry("p", "gpt-4o-mini", 0.2) == expected
@@ -0,0 +1,53 @@
+import asyncio
+
+from ai_auto_commit import ai_auto_commit
+from ai_auto_commit.ai_auto_commit import _filter_skipped_files
+
+
+def test_filter_skipped_files_drops_lock_and_binary_sections():
+    diff = [
+        "diff --git a/src/app.py b/src/app.py\n",
+        "+print('hi')\n",
+        "diff --git a/package-lock.json b/package-lock.json\n",
+        "+{}\n",
+        "diff --git a/logo.png b/logo.png\n",
+        "Binary files differ\n",
+        "diff --git a/docs/png.md b/docs/png.md\n",
+        "+png\n",
+    ]
+    assert list(_filter_skipped_files(diff)) == [
+        "diff --git a/src/app.py b/src/app.py\n",
+        "+print('hi')\n",
+        "diff --git a/docs/png.md b/docs/png.md\n",
+        "+png\n",
+    ]
+
+
+def test_filter_skipped_files_handles_spaces_and_quoted_paths():
+    diff = [
+        "diff --git a/my docs/shot 1.png b/my docs/shot 1.png\n",
+        "Binary files differ\n",
+        'diff --git "a/web/yarn.lock" "b/web/yarn.lock"\n',
+        "+lock\n",
+        "diff --git a/my docs/notes.md b/my docs/notes.md\n",
+        "+note\n",
+    ]
+    assert list(_filter_skipped_files(diff)) == diff[4:]
+
+
+def test_gather_commit_inputs_uses_the_git_operations_helpers(git_repo, monkeypatch):
+    calls = []
+
+    def fake_unpushed(target_dir, remote):
+        calls.append(remote)
+        return True
+
+    monkeypatch.setattr(ai_auto_commit, "has_unpushed_commits", fake_unpushed)
+    (git_repo / "a.txt").write_text("b\n")
+    ai_auto_commit.run_git_command(git_repo, "add", "a.txt")
+    summary, diff, raw_numstat, branch, unpushed = asyncio.run(
+        ai_auto_commit._gather_commit_inputs(git_repo, "upstream")
+    )
+    assert branch == ai_auto_commit.current_branch(git_repo)
+    assert unpushed is True and calls == ["upstream"]
+    assert "a.txt" in raw_numstat and diff.startswith("diff --git a/a.txt")
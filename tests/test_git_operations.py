@@ -0,0 +1,376 @@
+import asyncio
+import os
+import subprocess
+
+import pytest
+
+from ai_auto_commit import git_operations
+from ai_auto_commit.git_operations import (
+    arun_git_command,
+    arun_git_command_output,
+    run_git_command_output,
+    run_git_command_stream,
+)
+
+
+def test_arun_git_command_output_matches_sync(git_repo):
+    (git_repo / "a.txt").write_text("a\nb\n")
+    subprocess.run(["git", "add", "."], cwd=git_repo, check=True)
+    expected = run_git_command_output(git_repo, "diff", "--cached", "--numstat")
+    actual = asyncio.run(arun_git_command_output(git_repo, "diff", "--cached", "--numstat"))
+    assert actual == expected == "1\t0\ta.txt\n"
+
+
+def test_arun_git_command_output_raises_on_failure(git_repo):
+    with pytest.raises(subprocess.CalledProcessError) as exc_info:
+        asyncio.run(arun_git_command_output(git_repo, "rev-parse", "no-such-ref"))
+    assert exc_info.value.stderr
+
+
+def test_arun_git_command_pushes_to_remote(git_repo, tmp_path_factory):
+    remote = tmp_path_factory.mktemp("remote")
+    subprocess.run(["git", "init", "-q", "--bare"], cwd=remote, check=True)
+    subprocess.run(["git", "remote", "add", "origin", str(remote)], cwd=git_repo, check=True)
+    branch = run_git_command_output(git_repo, "rev-parse", "--abbrev-ref", "HEAD").strip()
+    result = asyncio.run(arun_git_command(git_repo, "push", "origin", branch))
+    assert result.returncode == 0
+    assert run_git_command_output(remote, "rev-parse", branch) == run_git_command_output(
+        git_repo, "rev-parse", "HEAD"
+    )
+
+
+def test_run_git_command_stream_yields_lines(git_repo):
+    (git_repo / "b.txt").write_text("b\n")
+    subprocess.run(["git", "add", "."], cwd=git_repo, check=True)
+    lines = list(run_git_command_stream(git_repo, "diff", "--cached", "--name-only"))
+    assert lines == ["b.txt\n"]
+
+
+def test_run_git_command_stream_raises_after_output(git_repo):
+    with pytest.raises(subprocess.CalledProcessError):
+        list(run_git_command_stream(git_repo, "diff", "--no-such-option"))
+
+
+@pytest.mark.parametrize("args", [
+    ("rev-parse", "--abbrev-ref", "HEAD"),
+    ("diff", "--cached", "-U0", "--", "."),
+    ("diff", "--cached", "--name-status"),
+    ("diff", "--cached", "--numstat"),
+])
+def test_pygit2_output_matches_git(git_repo, args):
+    pytest.importorskip("pygit2")
+    (git_repo / "a.txt").write_text("a\nb\n")
+    (git_repo / "new.py").write_text("x = 1\n")
+    (git_repo / "logo.png").write_bytes(b"\x89PNG\x00\x01")
+    subprocess.run(["git", "add", "."], cwd=git_repo, check=True)
+    (git_repo / "new.py").write_text("x = 2\n")
+    (git_repo / "untracked.txt").write_text("u\n")
+
+    expected = subprocess.run(
+        ["git", "-C", str(git_repo), *args], capture_output=True, text=True, check=True
+    ).stdout
+    assert git_operations._pygit2_output(git_repo, args) == expected
+
+
+def test_git_is_invoked_by_absolute_path(tmp_path):
+    cmd = git_operations._git_cmd(tmp_path, ("status",))
+    assert os.path.isabs(cmd[0])
+    assert cmd[1:] == ["-C", str(tmp_path), "status"]
+
+
+def test_status_short_reuses_output_until_index_changes(git_repo, monkeypatch):
+    calls = []
+    real = git_operations.run_git_command_output
+
+    def counting(target_dir, *args):
+        calls.append(args)
+        return real(target_dir, *args)
+
+    monkeypatch.setattr(git_operations, "run_git_command_output", counting)
+    (git_repo / "b.txt").write_text("b\n")
+    assert git_operations.status_short(git_repo) == "?? b.txt\n"
+    assert git_operations.status_short(git_repo) == "?? b.txt\n"
+    assert len(calls) == 1
+
+    subprocess.run(["git", "add", "b.txt"], cwd=git_repo, check=True)
+    assert git_operations.status_short(git_repo) == "A  b.txt\n"
+    assert len(calls) == 2
+
+
+def test_git_session_resolves_revisions(git_repo):
+    head = run_git_command_output(git_repo, "rev-parse", "HEAD").strip()
+    with git_operations.GitSession(git_repo) as session:
+        assert session.resolve("HEAD", "no-such-ref") == [head, None]
+        assert session.resolve("HEAD") == [head]
+
+
+def test_has_unpushed_commits_compares_tips(git_repo, tmp_path_factory):
+    remote = tmp_path_factory.mktemp("remote")
+    subprocess.run(["git", "init", "-q", "--bare"], cwd=remote, check=True)
+    subprocess.run(["git", "remote", "add", "origin", str(remote)], cwd=git_repo, check=True)
+    branch = run_git_command_output(git_repo, "rev-parse", "--abbrev-ref", "HEAD").strip()
+    assert not git_operations.has_unpushed_commits(git_repo)
+
+    subprocess.run(["git", "push", "-q", "origin", branch], cwd=git_repo, check=True)
+    assert not git_operations.has_unpushed_commits(git_repo)
+
+    subprocess.run(["git", "commit", "-q", "--allow-empty", "-m", "next"], cwd=git_repo, check=True)
+    assert git_operations.has_unpushed_commits(git_repo)
+
+
+def test_clear_git_cache_untracks_ignored_files(git_repo, capsys):
+    (git_repo / "x.log").write_text("x\n")
+    (git_repo / "*.log").write_text("star\n")
+    (git_repo / "caf\u00e9 notes.log").write_text("c\n")
+    subprocess.run(["git", "add", "."], cwd=git_repo, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "logs"], cwd=git_repo, check=True)
+    (git_repo / "gone.log").write_text("g\n")
+    subprocess.run(["git", "add", "gone.log"], cwd=git_repo, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "gone"], cwd=git_repo, check=True)
+    (git_repo / "gone.log").unlink()
+    (git_repo / ".gitignore").write_text("x.log\ncaf*\ngone.log\n")
+
+    git_operations.clear_git_cache(git_repo)
+
+    tracked = run_git_command_output(git_repo, "ls-files").split()
+    assert tracked == ["*.log", "a.txt"]
+    assert (git_repo / "x.log").exists()
+    assert (git_repo / "caf\u00e9 notes.log").exists()
+    out = capsys.readouterr().out
+    assert "    → x.log\n" in out
+    assert "Successfully untracked 3 files" in out
+
+    with open(git_repo / ".gitignore", "a") as f:
+        f.write("a.txt\n")
+    git_operations.clear_git_cache(git_repo, quiet=True)
+    assert run_git_command_output(git_repo, "ls-files").split() == ["*.log"]
+    out = capsys.readouterr().out
+    assert "    → a.txt\n" not in out
+    assert "Successfully untracked 4 files" in out
+
+
+def test_get_target_directory_is_memoized_per_cwd(git_repo, monkeypatch):
+    sub = git_repo / "pkg" / "sub"
+    sub.mkdir(parents=True)
+    git_operations.clear_cache()
+    monkeypatch.chdir(sub)
+    assert git_operations.get_target_directory() == git_repo.resolve()
+    assert git_operations._find_repo_root.cache_info().misses == 1
+    assert git_operations.get_target_directory() == git_repo.resolve()
+    assert git_operations._find_repo_root.cache_info().hits == 1
+    git_operations.clear_cache()
+    assert git_operations._find_repo_root.cache_info().currsize == 0
+
+
+def test_get_repo_state_reads_branch_and_entries(git_repo, tmp_path_factory):
+    remote = tmp_path_factory.mktemp("remote")
+    subprocess.run(["git", "init", "-q", "--bare"], cwd=remote, check=True)
+    subprocess.run(["git", "remote", "add", "origin", str(remote)], cwd=git_repo, check=True)
+    branch = run_git_command_output(git_repo, "rev-parse", "--abbrev-ref", "HEAD").strip()
+    subprocess.run(["git", "push", "-q", "-u", "origin", branch], cwd=git_repo, check=True)
+
+    state = git_operations.get_repo_state(git_repo)
+    assert (state.branch, state.upstream, state.ahead, state.entries) == (
+        branch, f"origin/{branch}", 0, []
+    )
+    assert not git_operations.has_changes(git_repo, state)
+
+    subprocess.run(["git", "commit", "-q", "--allow-empty", "-m", "next"], cwd=git_repo, check=True)
+    subprocess.run(["git", "mv", "a.txt", "b.txt"], cwd=git_repo, check=True)
+    (git_repo / "new.txt").write_text("n\n")
+    state = git_operations.get_repo_state(git_repo)
+    assert state.ahead == 1
+    assert [entry[0] for entry in state.entries] == ["2", "?"]
+    assert git_operations.has_changes(git_repo, state)
+    assert git_operations.has_unpushed_commits(git_repo, state=state)
+
+
+def test_has_changes_can_skip_untracked_files(git_repo):
+    (git_repo / "new.txt").write_text("n\n")
+    assert git_operations.has_changes(git_repo)
+    assert not git_operations.has_changes(git_repo, include_untracked=False)
+    assert git_operations.has_untracked_files(git_repo)
+
+    (git_repo / "new.txt").unlink()
+    assert not git_operations.has_untracked_files(git_repo)
+    (git_repo / "a.txt").write_text("changed\n")
+    assert git_operations.has_changes(git_repo, include_untracked=False)
+
+
+@pytest.mark.filterwarnings("error::ResourceWarning")
+def test_has_changes_stops_at_the_first_entry(git_repo, monkeypatch):
+    for i in range(3000):
+        (git_repo / f"new{i:04}.txt").write_text("n\n")
+    records = []
+    real_records = git_operations.run_git_command_records
+
+    def counting_records(target_dir, *args):
+        for record in real_records(target_dir, *args):
+            records.append(record)
+            yield record
+
+    monkeypatch.setattr(git_operations, "run_git_command_records", counting_records)
+    assert git_operations.has_changes(git_repo)
+    # Only the branch headers and the first entry were read
+    assert len(records) < 10
+    assert not records[-1].startswith("#")
+
+
+def test_get_full_status_runs_queries_together(git_repo):
+    (git_repo / "a.txt").write_text("stashed\n")
+    subprocess.run(["git", "stash", "-q"], cwd=git_repo, check=True)
+    (git_repo / "new.txt").write_text("n\n")
+    branch = run_git_command_output(git_repo, "rev-parse", "--abbrev-ref", "HEAD").strip()
+
+    status, current, stash = git_operations.get_full_status(git_repo)
+    assert f"# branch.head {branch}\n" in status
+    assert "? new.txt\n" in status
+    assert current == branch
+    assert stash.startswith("stash@{0}")
+
+
+def test_run_git_command_records_yields_nul_records(git_repo):
+    (git_repo / "b c.txt").write_text("b\n")
+    subprocess.run(["git", "add", "."], cwd=git_repo, check=True)
+    records = git_operations.run_git_command_records(git_repo, "ls-files", "-z")
+    assert list(records) == ["a.txt", "b c.txt"]
+    with pytest.raises(subprocess.CalledProcessError):
+        list(git_operations.run_git_command_records(git_repo, "ls-files", "--no-such-option"))
+
+
+@pytest.mark.parametrize("stderr, action", [
+    ("! [rejected] main -> main (fetch first)\nerror: failed to push", "pull_rebase"),
+    ("fatal: The current branch has no upstream branch.", "set_upstream"),
+    ("ssh: connect: Connection refused", "retry"),
+    # Earlier categories win when several match
+    ("remote rejected (non-fast-forward); network hiccup", "pull_rebase"),
+    ("fatal: Authentication failed", None),
+    ("something else entirely", None),
+])
+def test_diagnose_push_failure_categories(tmp_path, stderr, action):
+    error = git_operations.diagnose_push_failure(tmp_path, "origin", "main", stderr, "")
+    assert error.recovery_action == action
+
+
+def test_get_target_directory_handles_linked_worktrees(git_repo, tmp_path_factory, monkeypatch):
+    worktree = tmp_path_factory.mktemp("wt") / "linked"
+    subprocess.run(["git", "worktree", "add", "-q", str(worktree)], cwd=git_repo, check=True)
+    git_operations.clear_cache()
+    monkeypatch.chdir(worktree)
+    root = git_operations.get_target_directory()
+    assert root == worktree.resolve()
+    assert (worktree / ".git").is_file()
+    assert (git_operations.git_dir(root) / "HEAD").is_file()
+    git_operations.clear_cache()
+
+
+def test_get_target_directory_outside_repo(tmp_path, monkeypatch):
+    git_operations.clear_cache()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+    with pytest.raises(RuntimeError, match="Not in a git repository"):
+        git_operations.get_target_directory()
+
+
+def test_current_branch_reads_head_without_git(git_repo, monkeypatch):
+    expected = run_git_command_output(git_repo, "rev-parse", "--abbrev-ref", "HEAD").strip()
+    calls = []
+    real = git_operations.run_git_command_output
+
+    def counting(target_dir, *args):
+        calls.append(args)
+        return real(target_dir, *args)
+
+    monkeypatch.setattr(git_operations, "run_git_command_output", counting)
+    assert git_operations.current_branch(git_repo) == expected
+    assert calls == []
+
+    subprocess.run(["git", "checkout", "-q", "--detach"], cwd=git_repo, check=True)
+    assert git_operations.current_branch(git_repo) == "HEAD"
+    subprocess.run(["git", "checkout", "-q", "-b", "feature"], cwd=git_repo, check=True)
+    assert git_operations.current_branch(git_repo) == "feature"
+
+
+def test_read_ref_handles_loose_and_packed_refs(git_repo, tmp_path_factory):
+    remote = tmp_path_factory.mktemp("remote")
+    subprocess.run(["git", "init", "-q", "--bare"], cwd=remote, check=True)
+    subprocess.run(["git", "remote", "add", "origin", str(remote)], cwd=git_repo, check=True)
+    branch = git_operations.current_branch(git_repo)
+    subprocess.run(["git", "push", "-q", "origin", branch], cwd=git_repo, check=True)
+    head = run_git_command_output(git_repo, "rev-parse", "HEAD").strip()
+
+    assert git_operations._read_ref(git_repo, "HEAD") == head
+    assert git_operations._read_ref(git_repo, f"refs/remotes/origin/{branch}") == head
+    subprocess.run(["git", "pack-refs", "--all"], cwd=git_repo, check=True)
+    assert git_operations._read_ref(git_repo, f"refs/remotes/origin/{branch}") == head
+    assert git_operations._read_ref(git_repo, "refs/remotes/origin/missing") is None
+
+
+def test_diagnose_push_failure_fills_in_remote_and_branch(tmp_path):
+    error = git_operations.diagnose_push_failure(
+        tmp_path, "upstream", "feature", "fatal: no upstream branch", ""
+    )
+    assert "'feature'" in str(error)
+    assert error.suggestion == "Run: git push --set-upstream upstream feature"
+
+
+def test_attempt_push_recovery_reports_git_stderr(git_repo):
+    success, message = git_operations.attempt_push_recovery(
+        git_repo, "nowhere", "main", "retry", auto_recover=True
+    )
+    assert not success
+    assert message.startswith("Retry failed: error:")
+    assert not message.endswith("\n")
+
+
+def test_push_with_recovery_skips_up_to_date_branch(git_repo, tmp_path_factory, monkeypatch):
+    remote = tmp_path_factory.mktemp("remote")
+    subprocess.run(["git", "init", "-q", "--bare"], cwd=remote, check=True)
+    subprocess.run(["git", "remote", "add", "origin", str(remote)], cwd=git_repo, check=True)
+    branch = git_operations.current_branch(git_repo)
+    assert git_operations.push_with_recovery(git_repo, "origin", branch) == (
+        f"Successfully pushed to origin/{branch}"
+    )
+
+    def no_push(*args, **kwargs):
+        raise AssertionError("git push should have been skipped")
+
+    monkeypatch.setattr(git_operations.subprocess, "run", no_push)
+    assert git_operations.push_with_recovery(git_repo, "origin", branch) == (
+        f"Nothing to push to origin/{branch}"
+    )
+
+
+def test_pull_rebase_recovery_pushes_on_top_of_remote(git_repo, tmp_path_factory):
+    remote = tmp_path_factory.mktemp("remote")
+    other = tmp_path_factory.mktemp("other")
+    subprocess.run(["git", "init", "-q", "--bare"], cwd=remote, check=True)
+    subprocess.run(["git", "remote", "add", "origin", str(remote)], cwd=git_repo, check=True)
+    branch = git_operations.current_branch(git_repo)
+    subprocess.run(["git", "push", "-q", "origin", branch], cwd=git_repo, check=True)
+
+    subprocess.run(["git", "clone", "-q", str(remote), str(other)], check=True)
+    (other / "b.txt").write_text("b\n")
+    subprocess.run(["git", "add", "."], cwd=other, check=True)
+    subprocess.run(
+        ["git", "-c", "user.name=O", "-c", "user.email=o@example.com", "commit", "-q", "-m", "theirs"],
+        cwd=other, check=True,
+    )
+    subprocess.run(["git", "push", "-q"], cwd=other, check=True)
+    (git_repo / "c.txt").write_text("c\n")
+    subprocess.run(["git", "add", "."], cwd=git_repo, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "ours"], cwd=git_repo, check=True)
+
+    success, _ = git_operations.attempt_push_recovery(
+        git_repo, "origin", branch, "pull_rebase", auto_recover=True
+    )
+    assert success
+    log = run_git_command_output(remote, "log", "--format=%s", branch).split()
+    assert log == ["ours", "theirs", "init"]
+
+
+def test_has_changes_outside_repo_is_false(tmp_path, monkeypatch):
+    monkeypatch.setenv("GIT_CEILING_DIRECTORIES", str(tmp_path.parent))
+    assert git_operations._try_git_output(tmp_path, "status") is None
+    assert not git_operations.has_changes(tmp_path)
+    assert not git_operations.has_unpushed_commits(tmp_path)
@@ -0,0 +1,87 @@
+import subprocess
+
+from ai_auto_commit import git_safety
+
+
+def test_verify_lists_changes_from_one_status(git_repo, capsys):
+    (git_repo / "a.txt").write_text("changed\n")
+    subprocess.run(["git", "mv", "a.txt", "b.txt"], cwd=git_repo, check=True)
+    (git_repo / "new file.txt").write_text("n\n")
+
+    assert git_safety.verify_working_directory_safety(git_repo)
+    out = capsys.readouterr().out
+    assert "    → RM: b.txt\n" in out
+    assert "    → ??: new file.txt\n" in out
+
+
+def test_detached_head_is_dangerous(git_repo):
+    assert not git_safety.check_dangerous_git_state(git_repo)
+    subprocess.run(["git", "checkout", "-q", "--detach"], cwd=git_repo, check=True)
+    assert git_safety.check_dangerous_git_state(git_repo)
+    assert not git_safety.verify_working_directory_safety(git_repo)
+
+
+def test_merge_in_progress_is_dangerous(git_repo, capsys):
+    (git_repo / ".git" / "MERGE_HEAD").write_text("0" * 40 + "\n")
+    assert git_safety.check_dangerous_git_state(git_repo)
+    assert "merge state" in capsys.readouterr().out
+
+
+def test_new_repo_without_commits_is_safe(tmp_path):
+    subprocess.run(["git", "init", "-q"], cwd=tmp_path, check=True)
+    assert git_safety.verify_working_directory_safety(tmp_path)
+
+
+def test_collected_state_is_reused_until_git_dir_changes(git_repo, monkeypatch):
+    calls = []
+    real = git_safety.get_repo_state
+
+    def counting(target_dir):
+        calls.append(target_dir)
+        return real(target_dir)
+
+    monkeypatch.setattr(git_safety, "get_repo_state", counting)
+    assert git_safety.verify_working_directory_safety(git_repo)
+    assert git_safety.verify_working_directory_safety(git_repo)
+    assert len(calls) == 1
+
+    (git_repo / ".git" / "MERGE_HEAD").write_text("0" * 40 + "\n")
+    assert not git_safety.verify_working_directory_safety(git_repo)
+    assert len(calls) == 2
+
+
+def test_safety_backup_survives_index_rewrite(git_repo, monkeypatch, tmp_path_factory):
+    monkeypatch.setattr(git_safety.tempfile, "gettempdir", lambda: str(tmp_path_factory.mktemp("tmp")))
+    original = (git_repo / ".git" / "index").read_bytes()
+    backup_dir = git_safety.create_safety_backup(git_repo)
+
+    (git_repo / "b.txt").write_text("b\n")
+    subprocess.run(["git", "add", "b.txt"], cwd=git_repo, check=True)
+    assert (backup_dir / "index").read_bytes() == original
+    git_safety.cleanup_backup(backup_dir)
+    assert not backup_dir.exists()
+
+
+def test_verify_no_files_deleted_reports_missing_paths(git_repo, capsys):
+    original = "?? new.txt\n M a.txt\n D gone.txt\n"
+    (git_repo / "a.txt").write_text("changed\n")
+    assert git_safety.verify_no_files_deleted(git_repo, original) is False
+    assert "    → new.txt\n" in capsys.readouterr().out
+
+    (git_repo / "new.txt").write_text("n\n")
+    assert git_safety.verify_no_files_deleted(git_repo, original) is True
+
+
+def test_snapshot_status_reuses_the_safety_check(git_repo, monkeypatch):
+    subprocess.run(["git", "mv", "a.txt", "b c.txt"], cwd=git_repo, check=True)
+    (git_repo / "new.txt").write_text("n\n")
+    assert git_safety.verify_working_directory_safety(git_repo)
+
+    def no_status(*args, **kwargs):
+        raise AssertionError("status ran again")
+
+    monkeypatch.setattr(git_safety, "get_repo_state", no_status)
+    snapshot = git_safety.snapshot_status(git_repo)
+    assert sorted(snapshot.splitlines()) == ["?? new.txt", "R  b c.txt"]
+    monkeypatch.undo()
+    assert git_safety.verify_no_files_deleted(git_repo, snapshot) is True
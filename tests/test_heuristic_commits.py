@@ -0,0 +1,176 @@
+import pytest
+
+from ai_auto_commit import heuristic_commits, response_cache
+from ai_auto_commit.heuristic_commits import (
+    build_heuristic_bullets,
+    categorize_path,
+    compose_commit_from_bullets,
+    compose_commit_from_bullets_local,
+    classify_chunk,
+    parse_raw_numstat,
+)
+
+ZERO = "0" * 40
+SHA = "422c2b7ab3b3c66803" + "8" * 22
+
+
+def test_parse_raw_numstat_plain_entries():
+    output = (
+        f":100644 100644 {SHA} {SHA} M\0src/app.py\0"
+        f":000000 100644 {ZERO} {SHA} A\0logo.png\0"
+        "3\t1\tsrc/app.py\0"
+        "-\t-\tlogo.png\0"
+    )
+    file_status, file_stats = parse_raw_numstat(output)
+    assert file_status == {"src/app.py": "M", "logo.png": "A"}
+    assert file_stats == {"src/app.py": (3, 1), "logo.png": (0, 0)}
+
+
+def test_parse_raw_numstat_rename_keyed_by_new_path():
+    output = (
+        f":100644 100644 {SHA} {SHA} R100\0old name.txt\0new\tname.txt\0"
+        "0\t0\t\0old name.txt\0new\tname.txt\0"
+    )
+    file_status, file_stats = parse_raw_numstat(output)
+    assert file_status == {"new\tname.txt": "R"}
+    assert file_stats == {"new\tname.txt": (0, 0)}
+
+
+def test_parse_raw_numstat_empty():
+    assert parse_raw_numstat("") == ({}, {})
+
+
+def test_is_trivial_change():
+    from ai_auto_commit.heuristic_commits import is_trivial_change
+
+    assert is_trivial_change({"src/app.py": (1, 1)})
+    assert is_trivial_change({"a.py": (4, 0), "b.py": (3, 2)})
+    assert not is_trivial_change({"a.py": (8, 2)})
+    assert not is_trivial_change({"a.py": (1, 0), "b.py": (1, 0), "c.py": (1, 0)})
+    assert not is_trivial_change({})
+
+
+@pytest.mark.parametrize("chunk, expected", [
+    (
+        "diff --git a/old.py b/new.py\nsimilarity index 100%\n"
+        "rename from old.py\nrename to new.py\n",
+        "- Rename old.py to new.py",
+    ),
+    (
+        "diff --git a/web/package-lock.json b/web/package-lock.json\n"
+        "@@ -1 +1 @@\n-  \"version\": \"1\"\n+  \"version\": \"2\"\n",
+        "- Bump dependencies in web/package-lock.json",
+    ),
+    (
+        "diff --git a/a.py b/a.py\n--- a/a.py\n+++ b/a.py\n"
+        "@@ -1,3 +1,4 @@\n-def f(x):  \n+def f(x):\n-\n+    \n+\n",
+        "- Whitespace cleanup in a.py",
+    ),
+    (
+        "diff --git a/a.py b/a.py\n--- a/a.py\n+++ b/a.py\n"
+        "@@ -1 +1 @@\n-        return x\n+    return x\n",
+        None,
+    ),
+    (
+        "diff --git a/a.py b/a.py\n--- a/a.py\n+++ b/a.py\n"
+        "@@ -1 +1 @@\n-SEP = \", \"\n+SEP = \",\"\n",
+        None,
+    ),
+    (
+        "diff --git a/a.py b/a.py\n--- a/a.py\n+++ b/a.py\n"
+        "@@ -1 +1 @@\n-def f( x ):\n+def f(x):\n",
+        None,
+    ),
+    (
+        "diff --git a/a.py b/a.py\n--- a/a.py\n+++ b/a.py\n@@ -1 +1 @@\n-x = 1\n+x = 2\n",
+        None,
+    ),
+    (
+        "diff --git a/old.py b/new.py\nsimilarity index 90%\n"
+        "rename from old.py\nrename to new.py\n@@ -1 +1 @@\n-a\n+b\n",
+        None,
+    ),
+])
+def test_classify_chunk(chunk, expected):
+    assert classify_chunk(chunk) == expected
+
+
+@pytest.mark.parametrize("path, category", [
+    ("docs/test_plan.md", "test"),
+    ("pkg/server_test.go", "test"),
+    ("README.rst", "docs"),
+    ("guide/intro.MD", "docs"),
+    ("web/yarn.lock", "chore"),
+    ("deploy/config/app.py", "chore"),
+    ("pyproject.toml", "chore"),
+    ("src/lock.py", "code"),
+    ("src/app.py", "code"),
+])
+def test_categorize_path(path, category):
+    assert categorize_path(path) == category
+
+
+def test_build_heuristic_bullets():
+    bullets = build_heuristic_bullets(
+        {"src/a.py": "M", "README.md": "A", "tests/t.py": "D", "lib/a.py": "R", "src/b/a.py": "M"},
+        {"src/a.py": (3, 1), "src/b/a.py": (3, 1)},
+    )
+    assert bullets == [
+        ("- Update code in src: a.py (+3 -1)", "code"),
+        ("- Add docs in README.md: README.md", "docs"),
+        ("- Remove tests in tests: t.py", "test"),
+        ("- Rename code in lib: a.py", "code"),
+    ]
+
+
+def test_compose_commit_from_bullets_local_uses_categories():
+    bullets = [("- Update code in tests_util: a.py", "code"), ("- Add docs in docs: b.md", "docs")]
+    message = compose_commit_from_bullets_local(bullets)
+    # A tie keeps the old precedence (docs before code)
+    assert message.startswith("docs: update docs\n\nSummary of changes\n- Update code in tests_util")
+    assert compose_commit_from_bullets_local(bullets + bullets[:1]).startswith("chore: update code")
+
+
+def test_compose_commit_from_bullets_reuses_cached_message(monkeypatch):
+    calls = []
+
+    def fake_invoke(model_name, prompt, temperature, max_tokens):
+        calls.append(prompt)
+        return f"`feat: add a ({len(calls)})`"
+
+    monkeypatch.setattr(heuristic_commits, "invoke_llm", fake_invoke)
+    monkeypatch.setattr(heuristic_commits, "try_reserve_tokens", lambda n: True)
+    bullets = [("- Add code in src: a.py", "code")]
+    assert compose_commit_from_bullets([], "m", 0.0) == "chore: no changes"
+    assert compose_commit_from_bullets(bullets, "m", 0.0) == "feat: add a (1)"
+    assert compose_commit_from_bullets(list(bullets), "m", 0.0) == "feat: add a (1)"
+    assert len(calls) == 1
+
+    # A new process finds the message in the on-disk cache
+    response_cache.reset()
+    assert compose_commit_from_bullets(bullets, "m", 0.0) == "feat: add a (1)"
+    assert compose_commit_from_bullets(bullets, "m", 0.5) == "feat: add a (2)"
+    assert len(calls) == 2
+
+    # Bypassing the cache asks again, and the fresh message replaces the old one
+    assert compose_commit_from_bullets(bullets, "m", 0.0, use_cache=False) == "feat: add a (3)"
+    response_cache.reset()
+    assert compose_commit_from_bullets(bullets, "m", 0.0) == "feat: add a (3)"
+    assert len(calls) == 3
+
+
+def test_composed_messages_and_bullets_use_separate_kinds():
+    key = response_cache.response_key("prompt", "m", 0.0)
+    response_cache.store_response("bullet", key, "- Add a")
+    response_cache.reset()
+    assert response_cache.get_cached_response("composed", key) is None
+    assert response_cache.get_cached_response("bullet", key) == "- Add a"
+
+
+def test_responses_are_reused_in_process_without_a_database(tmp_path, monkeypatch):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(blocker))
+    response_cache.reset()
+    response_cache.store_response("composed", "k", "feat: add a")
+    assert response_cache.get_cached_response("composed", "k") == "feat: add a"
@@ -34,3 +34,61 @@ def test_truncate_diff_to_limit():
     truncated = truncate_diff_to_limit(diff, limit)
     assert "[... Diff truncated" in truncated
     assert len(truncated) < len(diff)
+
+def test_prompt_large_diff_strategy_reprompts_until_valid(capsys):
+    from ai_auto_commit.large_diff_handler import prompt_large_diff_strategy
+
+    answers = iter(["x", "9", "2"])
+    prompts = []
+
+    def fake_input(prompt):
+        prompts.append(prompt)
+        return next(answers)
+
+    with patch("builtins.input", fake_input):
+        assert prompt_large_diff_strategy() == "truncate"
+    assert capsys.readouterr().out.count("Please enter 1, 2, or 3.") == 2
+    assert prompts[0] == "Select strategy [1/2/3, default: 1]: "
+    with patch("builtins.input", lambda prompt: ""):
+        assert prompt_large_diff_strategy() == "split"
+
+
+def test_summary_pool_is_shared(monkeypatch):
+    from ai_auto_commit import large_diff_handler
+
+    monkeypatch.setattr(large_diff_handler, "_summary_pool", None)
+    pool = large_diff_handler._get_summary_pool()
+    try:
+        assert large_diff_handler._get_summary_pool() is pool
+        assert pool._max_workers >= 4
+    finally:
+        pool.shutdown(wait=False)
+
+
+def test_split_and_summarize_keeps_batch_order_when_completed_out_of_order(monkeypatch, capsys):
+    import time
+
+    from ai_auto_commit import large_diff_handler
+
+    final_prompts = []
+
+    def fake_invoke(model_name, prompt, temperature, max_tokens):
+        if prompt.startswith("Summarize the following git diff"):
+            name = prompt.rsplit("+", 1)[1].strip()
+            if name == "a.py":
+                time.sleep(0.05)  # the first batch finishes last
+            return f"- Change {name}"
+        final_prompts.append(prompt)
+        return "feat: change files"
+
+    monkeypatch.setattr(large_diff_handler, "invoke_llm", fake_invoke)
+    # Every text counts as 10 tokens, so each file gets a batch of its own
+    # whatever the tokenizer would make of it
+    monkeypatch.setattr(large_diff_handler, "token_len", lambda text: 10)
+    diff = "\n".join(f"diff --git a/{n} b/{n}\n+{n}" for n in ("a.py", "b.py", "c.py"))
+    msg = large_diff_handler.split_and_summarize_diff(diff, "gpt-4o", 0.2, max_chunk_tokens=12)
+    assert msg == "feat: change files"
+    assert "Grouped into 3 batches" in capsys.readouterr().out
+    summaries = final_prompts[-1]
+    positions = [summaries.index(f"Change {name}") for name in ("a.py", "b.py", "c.py")]
+    assert positions == sorted(positions)
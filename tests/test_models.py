@@ -0,0 +1,87 @@
+import json
+import os
+
+import pytest
+
+from ai_auto_commit import models
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    monkeypatch.setattr(models, "get_config_path", lambda: path)
+    monkeypatch.setattr(models, "_config_cache", None)
+    return path
+
+
+def test_load_local_config_rereads_only_when_file_changes(config_file, monkeypatch):
+    config_file.write_text(json.dumps({"model": "a", "api_keys": {"openai": "k"}}))
+    loads = []
+    real_load = json.load
+    monkeypatch.setattr(models.json, "load", lambda f: loads.append(1) or real_load(f))
+
+    assert models.get_default_model() == "a"
+    assert models.get_all_api_keys() == {"openai": "k"}
+    assert len(loads) == 1
+
+    config_file.write_text(json.dumps({"model": "bb"}))
+    st = config_file.stat()
+    os.utime(config_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert models.get_default_model() == "bb"
+    assert len(loads) == 2
+
+
+def test_load_local_config_returns_independent_copies(config_file):
+    config_file.write_text(json.dumps({"token_budget": 10}))
+    models._load_local_config()["token_budget"] = 99
+    assert models._load_local_config() == {"token_budget": 10}
+
+
+def test_load_local_config_missing_file(config_file):
+    assert models._load_local_config() == {}
+    assert models.get_default_model() == "gpt-4o-mini"
+
+
+def test_accessors_use_preloaded_config(config_file):
+    # The file doesn't exist; values must come from the dict passed in
+    config = {"model": "m", "token_budget": 1234}
+    assert models.get_default_model(config) == "m"
+    assert models.get_token_budget(config) == 1234
+    assert models.get_token_budget({}) == 250_000
+
+
+def test_get_model_config_precedence(monkeypatch):
+    catalog = {
+        "first": {"models": ["Shared"], "model_api_ids": {"Shared": "shared-1", "Alias": "dup"}},
+        "second": {"models": ["dup"], "model_api_ids": {"Other": "other-2"}},
+    }
+    monkeypatch.setattr(models, "_get_available_providers", lambda: catalog)
+    models._model_index.cache_clear()
+    try:
+        shared = models.get_model_config("Shared")
+        assert (shared.provider, shared.name, shared.display_name) == ("first", "shared-1", "Shared")
+        # An API ID in an earlier provider beats a display name in a later one
+        assert models.get_model_config("dup").provider == "first"
+        assert models.get_model_config("other-2").display_name == "Other"
+        assert models.get_model_config("missing") is None
+    finally:
+        models._model_index.cache_clear()
+
+
+def test_get_all_providers_reads_catalog_once(monkeypatch):
+    calls = []
+
+    def catalog():
+        calls.append(1)
+        return {"openai": {}, "none": {}, "anthropic": {}}
+
+    monkeypatch.setattr(models, "_get_available_providers", catalog)
+    models._provider_keys.cache_clear()
+    try:
+        providers = models.get_all_providers()
+        assert providers == ["openai", "anthropic"]
+        providers.append("mutated")
+        assert models.get_all_providers() == ["openai", "anthropic"]
+        assert len(calls) == 1
+    finally:
+        models._provider_keys.cache_clear()
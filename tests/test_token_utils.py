@@ -0,0 +1,18 @@
+from ai_auto_commit import token_utils
+
+
+def test_token_len_is_memoized(monkeypatch):
+    token_utils.token_len.cache_clear()
+    calls = []
+    real_encode = token_utils.ENC.encode
+
+    def counting_encode(text):
+        calls.append(text)
+        return real_encode(text)
+
+    monkeypatch.setattr(token_utils.ENC, "encode", counting_encode)
+    text = "diff --git a/x b/x\n+hello\n"
+    first = token_utils.token_len(text)
+    assert token_utils.token_len(text) == first
+    assert calls == [text]
+    token_utils.token_len.cache_clear()